@@ -197,6 +197,38 @@ app.post("/clear", async (req, res) => {
   }
 });
 
+// Replace a list's contents: clear, then add, in one request
+app.post("/replace", async (req, res) => {
+  try {
+    const { items, list: listName } = req.body;
+    if (!items || !Array.isArray(items))
+      return res.status(400).json({ error: "items array is required" });
+
+    const result = await withReauth(async () => {
+      await anylist.getLists();
+      const list = findList(listName);
+      if (!list) throw new Error(`List not found: ${listName || "Grocery"}`);
+
+      let cleared = 0;
+      for (const item of [...list.items]) {
+        await list.removeItem(item);
+        cleared++;
+      }
+      let added = 0;
+      for (const name of items) {
+        const newItem = anylist.createItem({ name });
+        await list.addItem(newItem);
+        added++;
+      }
+      return { cleared, added };
+    });
+    res.json({ status: "replaced", ...result });
+  } catch (err) {
+    console.error("POST /replace error:", err.message);
+    res.status(500).json({ error: err.message });
+  }
+});
+
 // Auth on startup, then start server
 ensureAuth()
   .then(() => {
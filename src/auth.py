@@ -0,0 +1,138 @@
+"""Process-wide Google OAuth credentials shared by Calendar and Gmail.
+
+Calendar and Gmail use the same token.json (both scopes are granted at setup),
+so credentials are loaded once per process and refreshed under a lock — only
+the first caller pays the OAuth token refresh round trip.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+
+from src.config import GOOGLE_CREDENTIALS_JSON, GOOGLE_TOKEN_JSON
+
+logger = logging.getLogger(__name__)
+
+SCOPES = [
+    "https://www.googleapis.com/auth/calendar",
+    "https://www.googleapis.com/auth/gmail.readonly",
+]
+TOKEN_PATH = os.path.join(os.path.dirname(__file__), "..", "token.json")
+CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), "..", "credentials.json")
+_VOLUME_TOKEN_PATH = Path("/app/data/token.json")
+
+_lock = threading.Lock()
+_creds: Credentials | None = None
+
+
+def _load_credentials() -> Credentials | None:
+    """Load stored credentials.
+
+    Credential loading priority:
+    1. GOOGLE_TOKEN_JSON env var (Railway / containerized deployments)
+    2. Volume-backed token file at /app/data/token.json (persists refreshed tokens)
+    3. Local token.json file (development)
+    """
+    # 1. Try env var first (Railway deployment)
+    if GOOGLE_TOKEN_JSON:
+        try:
+            token_data = json.loads(GOOGLE_TOKEN_JSON)
+            creds = Credentials.from_authorized_user_info(token_data, SCOPES)
+            logger.info("Google credentials loaded from GOOGLE_TOKEN_JSON env var")
+            return creds
+        except Exception as e:
+            logger.error("Failed to load GOOGLE_TOKEN_JSON: %s", e)
+
+    # 2. Try volume-backed token file (persists across redeploys)
+    if _VOLUME_TOKEN_PATH.exists():
+        try:
+            creds = Credentials.from_authorized_user_file(str(_VOLUME_TOKEN_PATH), SCOPES)
+            logger.info("Google credentials loaded from volume token file")
+            return creds
+        except Exception as e:
+            logger.warning("Failed to load volume token file: %s", e)
+
+    # 3. Try local token file (development)
+    if os.path.exists(TOKEN_PATH):
+        return Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+
+    return None
+
+
+def _run_interactive_flow() -> Credentials:
+    """Interactive OAuth flow via credentials.json (initial local setup only)."""
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
+    cred_path = CREDENTIALS_PATH
+    if GOOGLE_CREDENTIALS_JSON:
+        # Write credentials from env var to temp file for the flow
+        import tempfile
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
+            f.write(GOOGLE_CREDENTIALS_JSON)
+            cred_path = f.name
+    flow = InstalledAppFlow.from_client_secrets_file(cred_path, SCOPES)
+    return flow.run_local_server(port=0)
+
+
+def _persist(creds: Credentials) -> None:
+    """Persist refreshed/new token to volume (survives redeploys) and local file."""
+    token_json = creds.to_json()
+    if _VOLUME_TOKEN_PATH.parent.exists():
+        _VOLUME_TOKEN_PATH.write_text(token_json)
+    with open(TOKEN_PATH, "w") as f:
+        f.write(token_json)
+
+
+def refresh_if_expired(creds: Credentials) -> bool:
+    """Refresh *creds* in place if expired (with retry for transient network failures).
+
+    Returns True if a refresh happened. Callers must hold ``_lock``.
+    """
+    if creds.valid or not (creds.expired and creds.refresh_token):
+        return False
+    for attempt in range(3):
+        try:
+            creds.refresh(Request())
+            logger.info("Google credentials refreshed successfully")
+            return True
+        except Exception as e:
+            if attempt < 2:
+                logger.warning("Token refresh attempt %d failed: %s", attempt + 1, e)
+                time.sleep(2**attempt)
+            else:
+                logger.error("Token refresh failed after 3 attempts: %s", e)
+                raise
+    return False
+
+
+def get_google_credentials(interactive: bool = True) -> Credentials:
+    """Return the process-wide Google credentials, refreshing only when expired.
+
+    With ``interactive=False`` a missing/unrefreshable token raises RuntimeError
+    instead of launching the local OAuth browser flow (used by background Gmail syncs).
+    """
+    global _creds
+    with _lock:
+        if _creds is None:
+            _creds = _load_credentials()
+            if _creds is not None and not _creds.valid and not (_creds.expired and _creds.refresh_token):
+                _creds = None  # Can't refresh, need new auth
+            if _creds is None:
+                if not interactive:
+                    raise RuntimeError(
+                        "Google OAuth token not found or invalid. Re-run setup_calendar.py to authorize Gmail access."
+                    )
+                _creds = _run_interactive_flow()
+                _persist(_creds)
+                return _creds
+
+        if refresh_if_expired(_creds):
+            _persist(_creds)
+        return _creds
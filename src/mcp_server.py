@@ -1,6 +1,10 @@
 """MCP server exposing family meeting assistant tools for Claude Desktop."""
 
+import atexit
 import logging
+import logging.handlers
+import os
+import queue
 import sys
 from pathlib import Path
 
@@ -14,14 +18,20 @@ from dotenv import load_dotenv  # noqa: E402
 
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
-# Configure logging to stderr (stdout is reserved for MCP stdio transport)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(name)s %(levelname)s %(message)s",
-    stream=sys.stderr,
-)
+# Configure logging to stderr (stdout is reserved for MCP stdio transport).
+# Records go through a QueueHandler so tool calls never block on stderr writes;
+# a background QueueListener does the actual formatting + I/O.
+_LOG_LEVEL = os.environ.get("FAMILY_MEETING_LOG_LEVEL", "WARNING").upper()
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_stderr_handler = logging.StreamHandler(sys.stderr)
+_stderr_handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _stderr_handler, respect_handler_level=True)
+logging.basicConfig(level=_LOG_LEVEL, handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+import orjson  # noqa: E402
 from mcp.server.fastmcp import FastMCP  # noqa: E402
 
 from src.assistant import _handle_push_grocery_list, _handle_write_calendar_blocks, generate_daily_plan  # noqa: E402
@@ -35,6 +45,18 @@ _store = FAMILY_CONFIG.get("grocery_store", "grocery store")
 
 mcp = FastMCP("family-meeting")
 
+
+def _to_text(result) -> str:
+    """Serialize a structured tool result for the stdio transport.
+
+    Dicts/lists (recipe details, meal plans, reorder lists) are encoded with
+    orjson, which is several times faster than repr()/json.dumps on large payloads.
+    """
+    if isinstance(result, str):
+        return result
+    return orjson.dumps(result, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # ---------------------------------------------------------------------------
 # Calendar tools
 # ---------------------------------------------------------------------------
@@ -286,7 +308,7 @@ def extract_and_save_recipe(image_base64: str, mime_type: str, cookbook_name: st
     Provide base64-encoded image data, MIME type, and optional cookbook name.
     """
     result = recipes.extract_and_save_recipe(image_base64, mime_type, cookbook_name)
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
@@ -296,14 +318,14 @@ def search_recipes(query: str = "", cookbook_name: str = "", tags: list[str] | N
     Returns matching recipes with name, cookbook, prep/cook time, and usage count.
     """
     result = recipes.search_recipes(query, cookbook_name, tags)
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
 def get_recipe_details(recipe_id: str) -> str:
     """Get full recipe details including ingredients, step-by-step instructions, photo URL, and all metadata."""
     result = recipes.get_recipe_details(recipe_id)
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
@@ -314,14 +336,14 @@ def recipe_to_grocery_list(recipe_id: str, servings_multiplier: float = 1.0) ->
     Use servings_multiplier to scale quantities.
     """
     result = recipes.recipe_to_grocery_list(recipe_id, servings_multiplier)
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
 def list_cookbooks_tool() -> str:
     """List all saved cookbooks with recipe counts. Shows what's been catalogued."""
     result = recipes.list_cookbooks()
-    return str(result)
+    return _to_text(result)
 
 
 # ---------------------------------------------------------------------------
@@ -336,21 +358,21 @@ def check_reorder_items() -> str:
     Returns items grouped by store with days overdue.
     """
     result = proactive.check_reorder_items()
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
 def confirm_groceries_ordered() -> str:
     """Mark all pending grocery orders as confirmed (updates Last Ordered to today, clears Pending Order flags)."""
     result = proactive.handle_order_confirmation()
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
 def generate_meal_plan_tool() -> str:
     """Generate a 6-night dinner plan (Mon-Sat) considering saved recipes, family preferences, and schedule density."""
     result = proactive.generate_meal_plan()
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
@@ -361,21 +383,21 @@ def detect_conflicts(days_ahead: int = 7) -> str:
     (overlapping with routines like pickups).
     """
     result = proactive.detect_conflicts(days_ahead)
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
 def check_action_item_progress() -> str:
     """Check action item completion for the current week. Shows done/remaining counts with items grouped by assignee."""
     result = proactive.check_action_item_progress()
-    return str(result)
+    return _to_text(result)
 
 
 @mcp.tool()
 def get_budget_summary_formatted() -> str:
     """Get a formatted YNAB budget summary highlighting over-budget categories. Ready for WhatsApp."""
     result = proactive.format_budget_summary()
-    return str(result)
+    return _to_text(result)
 
 
 # ---------------------------------------------------------------------------
@@ -1,17 +1,27 @@
 """Amazon-YNAB Smart Sync — Gmail email parsing, order matching, classification, and sync orchestration."""
 
 import base64
+import heapq
 import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 from src.prompts import render_template
 
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None  # fall back to regex stripping in _strip_html
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -19,10 +29,15 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 
 _DATA_DIR = Path("/app/data") if Path("/app/data").exists() else Path("data")
-_SYNC_RECORDS_FILE = _DATA_DIR / "amazon_sync_records.json"
+_SYNC_RECORDS_FILE = _DATA_DIR / "amazon_sync_records.json"  # legacy format, migrated on first load
 _CATEGORY_MAPPINGS_FILE = _DATA_DIR / "category_mappings.json"
 _SYNC_CONFIG_FILE = _DATA_DIR / "amazon_sync_config.json"
 
+# Record statuses whose split was applied in YNAB (refund matching, status counts)
+_APPLIED_STATUSES = frozenset({"split_applied", "auto_split"})
+# Mapping sources a person confirmed (trusted for keyword substring matches)
+_USER_MAPPING_SOURCES = frozenset({"user_approved", "user_corrected"})
+
 
 # ---------------------------------------------------------------------------
 # Data model classes (from data-model.md)
@@ -51,6 +66,7 @@ class MatchedItem:
     classified_category_id: str = ""
     confidence: float = 0.0
     allocated_amount: int = 0  # milliunits (after tax/shipping proration)
+    title_normalized: str = ""  # title.lower().strip(), computed once at classification
 
 
 @dataclass
@@ -116,19 +132,51 @@ class SyncConfig:
     email_first_suggestion_date: str = ""
 
 
+@dataclass
+class _SyncContext:
+    """Sync state loaded once per nightly run and threaded through the pipeline.
+
+    ``records`` is the live dict behind load_sync_records(), so saves made during
+    the run are visible without re-reading the log.
+    """
+
+    config: SyncConfig
+    records: dict[str, dict]
+    category_mappings: dict[str, dict]
+
+
 # ---------------------------------------------------------------------------
 # Persistence helpers (atomic JSON read/write, same pattern as discovery.py)
 # ---------------------------------------------------------------------------
 
 
+# Parsed-file cache: path → ((st_mtime_ns, st_size), data). A file is only re-read
+# and re-parsed when its mtime/size changes. Callers that mutate the returned
+# dict must save it back via _save_json.
+_JSON_CACHE: dict[Path, tuple[tuple[int, int], dict]] = {}
+
+
 def _load_json(filepath: Path) -> dict:
     """Load JSON from file. Returns empty dict on failure."""
     try:
-        if filepath.exists():
-            return json.loads(filepath.read_text())
+        st = filepath.stat()
+    except FileNotFoundError:
+        _JSON_CACHE.pop(filepath, None)
+        return {}
     except Exception as e:
         logger.warning("Failed to load %s: %s", filepath, e)
-    return {}
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _JSON_CACHE.get(filepath)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    try:
+        data = orjson.loads(filepath.read_bytes())
+    except Exception as e:
+        logger.warning("Failed to load %s: %s", filepath, e)
+        return {}
+    _JSON_CACHE[filepath] = (stamp, data)
+    return data
 
 
 def _save_json(filepath: Path, data: dict) -> None:
@@ -136,25 +184,186 @@ def _save_json(filepath: Path, data: dict) -> None:
     try:
         _DATA_DIR.mkdir(parents=True, exist_ok=True)
         tmp = filepath.with_suffix(".tmp")
-        tmp.write_text(json.dumps(data, indent=2, default=str))
+        tmp.write_bytes(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2))
         tmp.replace(filepath)
+        st = filepath.stat()
+        _JSON_CACHE[filepath] = ((st.st_mtime_ns, st.st_size), data)
     except Exception as e:
+        _JSON_CACHE.pop(filepath, None)
         logger.warning("Failed to save %s: %s", filepath, e)
 
 
 # --- Sync Records ---
+#
+# Records live in an append-only NDJSON log: each save appends one
+# {"id": ..., "data": ...} line (last line per id wins), so a write costs
+# O(one record) instead of rewriting every record. The log is compacted
+# atomically once it holds more than 4x as many lines as unique records.
+
+_SYNC_RECORDS_LOG = _DATA_DIR / "amazon_sync_records.ndjson"
+_COMPACT_MIN_LINES = 200
+_records_state: dict = {}  # {"stamp": (mtime_ns, size), "records": dict, "lines": int}
+
+
+def _encode_record_line(txn_id: str, data: dict) -> bytes:
+    return orjson.dumps({"id": txn_id, "data": data}, default=str) + b"\n"
+
+
+def _records_log_stamp() -> tuple[int, int]:
+    st = _SYNC_RECORDS_LOG.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _compact_sync_records(records: dict[str, dict]) -> bool:
+    """Rewrite the records log with one line per record (tmp-file + rename)."""
+    try:
+        _DATA_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = _SYNC_RECORDS_LOG.with_suffix(".tmp")
+        tmp.write_bytes(b"".join(_encode_record_line(k, v) for k, v in records.items()))
+        tmp.replace(_SYNC_RECORDS_LOG)
+        _records_state.update(stamp=_records_log_stamp(), records=records, lines=len(records))
+        _records_state.pop("index", None)
+        return True
+    except Exception as e:
+        _records_state.clear()
+        logger.warning("Failed to compact %s: %s", _SYNC_RECORDS_LOG, e)
+        return False
+
+
+def _append_sync_records(entries: dict[str, dict]) -> None:
+    """Append updated records to the log with a single write + fsync."""
+    if not entries:
+        return
+    records = _read_sync_records()
+    if records is None and not _SYNC_RECORDS_LOG.exists() and _SYNC_RECORDS_FILE.exists():
+        # A fresh log would shadow the unmigrated legacy file for good
+        logger.warning("Not saving %d sync record(s): %s is not migrated yet", len(entries), _SYNC_RECORDS_FILE)
+        return
+    try:
+        _DATA_DIR.mkdir(parents=True, exist_ok=True)
+        payload = b"".join(_encode_record_line(k, v) for k, v in entries.items())
+        with _SYNC_RECORDS_LOG.open("a+b") as f:
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    payload = b"\n" + payload  # don't glue the first new line onto a torn one
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+    except Exception as e:
+        _records_state.clear()
+        logger.warning("Failed to save %s: %s", _SYNC_RECORDS_LOG, e)
+        return
+    if records is None or records is not _records_state.get("records"):
+        # Not backed by a full read of the log — append only; the next load re-reads it
+        _records_state.clear()
+        return
+    records.update(entries)
+    lines = _records_state["lines"] + len(entries)
+    _records_state.update(stamp=_records_log_stamp(), records=records, lines=lines)
+    _records_state.pop("index", None)  # secondary indexes are rebuilt lazily
+    if lines > _COMPACT_MIN_LINES and lines > 4 * len(records):
+        _compact_sync_records(records)
 
 
 def load_sync_records() -> dict[str, dict]:
     """Load sync records. Key = ynab_transaction_id."""
-    return _load_json(_SYNC_RECORDS_FILE)
+    records = _read_sync_records()
+    return {} if records is None else records
+
+
+def _read_sync_records() -> dict[str, dict] | None:
+    """Replay the records log (last line per id wins); None if it could not be read."""
+    try:
+        stamp = _records_log_stamp()
+    except FileNotFoundError:
+        # One-time migration from the legacy whole-file JSON format
+        legacy = _load_json(_SYNC_RECORDS_FILE)
+        if legacy and not _compact_sync_records(legacy):
+            return None
+        return legacy
+    if _records_state.get("stamp") == stamp:
+        return _records_state["records"]
+
+    records: dict[str, dict] = {}
+    lines = 0
+    try:
+        with _SYNC_RECORDS_LOG.open("rb") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = orjson.loads(line)
+                except ValueError:
+                    logger.warning("Skipping unreadable line in %s", _SYNC_RECORDS_LOG)  # e.g. torn write
+                    continue
+                records[entry["id"]] = entry["data"]
+                lines += 1
+    except Exception as e:
+        _records_state.clear()
+        logger.warning("Failed to load %s: %s", _SYNC_RECORDS_LOG, e)
+        return None
+    _records_state.update(stamp=stamp, records=records, lines=lines)
+    _records_state.pop("index", None)
+    return records
+
+
+@dataclass
+class _RecordsIndex:
+    """Secondary indexes over sync records (values are txn IDs in record order)."""
+
+    by_status: dict[str, list[str]]
+    by_month: dict[str, list[str]]  # "YYYY-MM" of ynab_date
+    by_amount: dict[int, list[str]]  # abs(ynab_amount), milliunits
+    by_item_amount: dict[int, list[str]]  # abs(item allocated_amount), milliunits
+
+
+def _records_index(records: dict[str, dict] | None = None) -> _RecordsIndex:
+    """Return secondary indexes for ``records`` (default: the stored records).
+
+    Indexes over the cached records dict are kept until the next save or reload.
+    """
+    if records is None:
+        records = load_sync_records()
+    cacheable = records is _records_state.get("records")
+    if cacheable and "index" in _records_state:
+        return _records_state["index"]
+
+    index = _RecordsIndex(by_status={}, by_month={}, by_amount={}, by_item_amount={})
+    for txn_id, record in records.items():
+        index.by_status.setdefault(record.get("status", ""), []).append(txn_id)
+        rec_date = record.get("ynab_date", "")
+        if rec_date:
+            index.by_month.setdefault(rec_date[:7], []).append(txn_id)
+        index.by_amount.setdefault(abs(record.get("ynab_amount", 0)), []).append(txn_id)
+        for amt in {abs(item.get("allocated_amount", 0)) for item in record.get("items", [])}:
+            index.by_item_amount.setdefault(amt, []).append(txn_id)
+
+    if cacheable:
+        _records_state["index"] = index
+    return index
 
 
 def save_sync_record(record: SyncRecord) -> None:
-    """Save or update a single sync record."""
+    """Save or update a single sync record (no-op if the stored record is identical)."""
     records = load_sync_records()
-    records[record.ynab_transaction_id] = asdict(record)
-    _save_json(_SYNC_RECORDS_FILE, records)
+    data = vars(record).copy()  # flat dataclass (items already dicts) — no recursive asdict()
+    if records.get(record.ynab_transaction_id) == data:
+        return
+    _append_sync_records({record.ynab_transaction_id: data})
+
+
+def save_sync_records(records: list[SyncRecord]) -> None:
+    """Save or update several sync records with a single append."""
+    if not records:
+        return
+    stored = load_sync_records()
+    changed = {}
+    for record in records:
+        data = vars(record).copy()
+        if stored.get(record.ynab_transaction_id) != data:
+            changed[record.ynab_transaction_id] = data
+    _append_sync_records(changed)
 
 
 def load_sync_record(ynab_transaction_id: str) -> SyncRecord | None:
@@ -181,22 +390,42 @@ def load_category_mappings() -> dict[str, dict]:
 
 
 def save_category_mapping(mapping: CategoryMapping) -> None:
-    """Save or update a category mapping."""
+    """Save or update a category mapping (no-op if the stored mapping is identical)."""
     mappings = load_category_mappings()
-    mappings[mapping.item_title_normalized] = asdict(mapping)
+    data = vars(mapping).copy()
+    if mappings.get(mapping.item_title_normalized) == data:
+        return
+    mappings[mapping.item_title_normalized] = data
     _save_json(_CATEGORY_MAPPINGS_FILE, mappings)
 
 
-def lookup_cached_category(item_title: str) -> Optional[dict]:
-    """Look up a cached category mapping by item title. Returns mapping dict or None."""
+def save_category_mappings(new_mappings: list[CategoryMapping]) -> None:
+    """Save or update several category mappings with a single file write."""
     mappings = load_category_mappings()
+    changed = False
+    for mapping in new_mappings:
+        data = vars(mapping).copy()
+        if mappings.get(mapping.item_title_normalized) != data:
+            mappings[mapping.item_title_normalized] = data
+            changed = True
+    if changed:
+        _save_json(_CATEGORY_MAPPINGS_FILE, mappings)
+
+
+def lookup_cached_category(item_title: str, mappings: dict | None = None) -> Optional[dict]:
+    """Look up a cached category mapping by item title. Returns mapping dict or None.
+
+    Pass a preloaded ``mappings`` dict when looking up many titles in one pass.
+    """
+    if mappings is None:
+        mappings = load_category_mappings()
     normalized = item_title.lower().strip()
     if normalized in mappings:
         return mappings[normalized]
     # Keyword substring match from learned patterns
     for key, mapping in mappings.items():
         if key in normalized or normalized in key:
-            if mapping.get("confidence", 0) >= 0.8 and mapping.get("source") in ("user_approved", "user_corrected"):
+            if mapping.get("confidence", 0) >= 0.8 and mapping.get("source") in _USER_MAPPING_SOURCES:
                 return mapping
     return None
 
@@ -231,39 +460,117 @@ def load_sync_config() -> SyncConfig:
 
 def save_sync_config(config: SyncConfig) -> None:
     """Save sync config."""
-    _save_json(_SYNC_CONFIG_FILE, asdict(config))
+    _save_json(_SYNC_CONFIG_FILE, vars(config).copy())
+
+
+def _load_sync_context() -> _SyncContext:
+    """Load config, records and category mappings once for an orchestrator pass."""
+    return _SyncContext(
+        config=load_sync_config(),
+        records=load_sync_records(),
+        category_mappings=load_category_mappings(),
+    )
+
+
+def _dollars(milliunits: int) -> float:
+    """Absolute YNAB milliunit amount in dollars (for display)."""
+    return abs(milliunits) / 1000
 
 
 # ---------------------------------------------------------------------------
 # Gmail API helpers (T007 — Gmail pivot)
 # ---------------------------------------------------------------------------
 
-_TOKEN_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "token.json")
-_GMAIL_SCOPES = [
-    "https://www.googleapis.com/auth/calendar",
-    "https://www.googleapis.com/auth/gmail.readonly",
-]
-
 
+@lru_cache(maxsize=1)
 def _get_gmail_service():
-    """Build and return an authenticated Gmail API service."""
-    from google.auth.transport.requests import Request
-    from google.oauth2.credentials import Credentials
+    """Build and return an authenticated Gmail API service (built once per process).
+
+    The shared credentials from src.auth are refreshed in place, so the cached
+    service keeps working across token refreshes.
+    """
     from googleapiclient.discovery import build
 
-    creds = None
-    if os.path.exists(_TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(_TOKEN_PATH, _GMAIL_SCOPES)
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-            with open(_TOKEN_PATH, "w") as f:
-                f.write(creds.to_json())
+    from src.auth import get_google_credentials
+
+    # Bundled discovery doc: no discovery fetch, no discovery-cache writes
+    return build(
+        "gmail",
+        "v1",
+        credentials=get_google_credentials(interactive=False),
+        static_discovery=True,
+        cache_discovery=False,
+    )
+
+
+_GMAIL_BATCH_SIZE = 100  # Gmail batch endpoint limit per HTTP request
+
+
+def _batch_get_messages(service, message_ids: list[str]) -> dict[str, dict]:
+    """Fetch full Gmail messages in batches of up to 100 per HTTP round trip.
+
+    Returns dict of message_id → message. Messages whose batch entry failed
+    (or whose whole batch failed) are retried individually.
+    """
+    fetched: dict[str, dict] = {}
+
+    def _on_msg(request_id, response, exception):
+        if exception is None:
+            fetched[request_id] = response
         else:
-            raise RuntimeError(
-                "Gmail OAuth token not found or invalid. Re-run setup_calendar.py to authorize Gmail access."
-            )
-    return build("gmail", "v1", credentials=creds)
+            logger.warning("Batch fetch failed for email %s: %s", request_id, exception)
+
+    for start in range(0, len(message_ids), _GMAIL_BATCH_SIZE):
+        chunk = message_ids[start : start + _GMAIL_BATCH_SIZE]
+        batch = service.new_batch_http_request(callback=_on_msg)
+        for msg_id in chunk:
+            batch.add(service.users().messages().get(userId="me", id=msg_id, format="full"), request_id=msg_id)
+        try:
+            batch.execute()
+        except Exception as e:
+            logger.warning("Gmail batch request failed, falling back to per-message fetch: %s", e)
+
+    for msg_id in message_ids:
+        if msg_id in fetched:
+            continue
+        try:
+            fetched[msg_id] = service.users().messages().get(userId="me", id=msg_id, format="full").execute()
+        except Exception as e:
+            logger.warning("Failed to fetch email %s: %s", msg_id, e)
+
+    return fetched
+
+
+def _decode_part(data: str) -> str:
+    return base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")
+
+
+def _extract_body(message: dict) -> tuple[str, str]:
+    """Extract (plain, html) bodies from a Gmail API message payload.
+
+    Parts are matched on mimeType before any base64 decoding, and the HTML part
+    is only decoded when no text/plain part exists — at most one part is decoded.
+    """
+    payload = message.get("payload", {})
+    plain_data = html_data = ""
+
+    # Direct body, then parts (and nested multipart)
+    candidates = [payload]
+    for part in payload.get("parts", []):
+        candidates.append(part)
+        candidates.extend(part.get("parts", []))
+    for part in candidates:
+        mime = part.get("mimeType")
+        if mime == "text/plain" and not plain_data:
+            plain_data = part.get("body", {}).get("data", "")
+        elif mime == "text/html" and not html_data:
+            html_data = part.get("body", {}).get("data", "")
+
+    if plain_data:
+        return _decode_part(plain_data), ""
+    if html_data:
+        return "", _decode_part(html_data)
+    return "", ""
 
 
 def _extract_html_body(message: dict) -> str:
@@ -274,33 +581,67 @@ def _extract_html_body(message: dict) -> str:
     if payload.get("mimeType") == "text/html":
         data = payload.get("body", {}).get("data", "")
         if data:
-            return base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")
+            return _decode_part(data)
 
     # Check parts (and nested multipart)
     for part in payload.get("parts", []):
         if part.get("mimeType") == "text/html":
             data = part.get("body", {}).get("data", "")
             if data:
-                return base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")
+                return _decode_part(data)
         for subpart in part.get("parts", []):
             if subpart.get("mimeType") == "text/html":
                 data = subpart.get("body", {}).get("data", "")
                 if data:
-                    return base64.urlsafe_b64decode(data).decode("utf-8", errors="replace")
+                    return _decode_part(data)
 
     return ""
 
 
+# Precompiled patterns for _strip_html / _parse_order_email (hot path: every email)
+_RE_STYLE = re.compile(r"<style[^>]*>.*?</style>", re.DOTALL | re.IGNORECASE)
+_RE_SCRIPT = re.compile(r"<script[^>]*>.*?</script>", re.DOTALL | re.IGNORECASE)
+_RE_BR = re.compile(r"<br[^>]*>", re.IGNORECASE)
+_RE_BLOCK_CLOSE = re.compile(r"</(tr|p|div|td|li|h[1-6])>", re.IGNORECASE)
+_BLOCK_SELECTOR = "tr, p, div, td, li, h1, h2, h3, h4, h5, h6"  # same set as _RE_BLOCK_CLOSE
+_RE_TAG = re.compile(r"<[^>]+>")
+_RE_ORDER_NUM = re.compile(r"^\d{3}-\d{7}-\d{7}$")
+_RE_ORDER_NUM_LOOSE = re.compile(r"\d{3}-\d{7}-\d{7}")
+
+
 def _strip_html(html: str) -> str:
-    """Strip HTML tags and collapse whitespace to produce clean text for parsing."""
+    """Strip HTML tags and collapse whitespace to produce clean text for parsing.
+
+    Uses selectolax's C parser (single pass, entities decoded) when available,
+    falling back to the regex chain. Both break lines only at <br> and block
+    closes, so inline runs like <span>$</span><span>12.99</span> stay together.
+    """
+    if HTMLParser is not None:
+        try:
+            tree = HTMLParser(html)
+            for node in tree.css("script, style"):
+                node.decompose()
+            for node in tree.css("br"):
+                node.replace_with("\n")
+            for node in tree.css(_BLOCK_SELECTOR):
+                node.insert_after("\n")
+            text = tree.text(separator=" ")
+            return "\n".join(filter(None, (" ".join(line.split()) for line in text.split("\n"))))
+        except Exception as e:
+            logger.debug("selectolax parse failed, using regex fallback: %s", e)
+    return _strip_html_regex(html)
+
+
+def _strip_html_regex(html: str) -> str:
+    """Regex-based _strip_html fallback (no C extension required)."""
     # Remove style and script blocks entirely
-    text = re.sub(r"<style[^>]*>.*?</style>", " ", html, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r"<script[^>]*>.*?</script>", " ", text, flags=re.DOTALL | re.IGNORECASE)
+    text = _RE_STYLE.sub(" ", html)
+    text = _RE_SCRIPT.sub(" ", text)
     # Replace <br>, <tr>, <p>, <div> with newlines for structure
-    text = re.sub(r"<br[^>]*>", "\n", text, flags=re.IGNORECASE)
-    text = re.sub(r"</(tr|p|div|td|li|h[1-6])>", "\n", text, flags=re.IGNORECASE)
+    text = _RE_BR.sub("\n", text)
+    text = _RE_BLOCK_CLOSE.sub("\n", text)
     # Remove remaining HTML tags
-    text = re.sub(r"<[^>]+>", " ", text)
+    text = _RE_TAG.sub(" ", text)
     # Decode common entities
     text = (
         text.replace("&nbsp;", " ")
@@ -315,20 +656,69 @@ def _strip_html(html: str) -> str:
     return text
 
 
-def _parse_order_email(html_body: str, email_date: str = "") -> list[dict]:
+_ORDER_EXTRACTION_TOOL = {
+    "name": "extract_orders",
+    "description": "Record every order found in an Amazon order confirmation email.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "orders": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "order_number": {"type": ["string", "null"], "description": "###-#######-#######"},
+                        "grand_total": {"type": ["number", "null"]},
+                        "items": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "title": {"type": "string"},
+                                    "price": {"type": ["number", "null"]},
+                                    "quantity": {"type": "integer"},
+                                },
+                                "required": ["title"],
+                            },
+                        },
+                    },
+                    "required": ["order_number", "grand_total", "items"],
+                },
+            }
+        },
+        "required": ["orders"],
+    },
+}
+
+
+def _parse_order_email(html_body: str, email_date: str = "", plain_text: str = "") -> list[dict]:
     """Use Claude to parse Amazon order confirmation email into structured data.
 
-    Strips HTML first, then sends clean text to Claude Haiku.
-    One email may contain multiple orders — returns a list of order dicts.
-    Each dict has keys: order_number, order_date, grand_total, items.
+    Uses the text/plain part when given (no HTML cleaning needed), otherwise
+    strips HTML first, then sends clean text to Claude Haiku with a forced
+    extract_orders tool call. One email may contain multiple orders — returns
+    a list of order dicts. Each dict has keys: order_number, order_date, grand_total, items.
     Returns empty list if parsing fails.
     """
     from anthropic import Anthropic
 
     from src.config import ANTHROPIC_API_KEY
 
-    # Strip HTML to plain text — dramatically reduces noise for Claude
-    clean_text = _strip_html(html_body)
+    if plain_text:
+        # Plain-text part: just collapse whitespace, skip HTML cleaning entirely
+        clean_text = "\n".join(filter(None, (" ".join(line.split()) for line in plain_text.split("\n"))))
+    else:
+        # Narrow to the order section before stripping — Amazon emails carry large
+        # header/footer boilerplate. Keep the full body if the markers aren't found
+        # or the window would lose the Grand Total.
+        lowered = html_body.lower()
+        lo = lowered.find("order")
+        hi = lowered.rfind("view or manage order")
+        if 0 <= lo < hi and "grand total" in lowered[lo:hi]:
+            html_body = html_body[max(0, lo - 500) : hi + 500]
+
+        # Strip HTML to plain text — dramatically reduces noise for Claude
+        clean_text = _strip_html(html_body)
 
     # Truncate to stay within token limits
     if len(clean_text) > 15000:
@@ -339,29 +729,34 @@ def _parse_order_email(html_body: str, email_date: str = "") -> list[dict]:
         logger.debug("Email doesn't look like an Amazon order confirmation, skipping")
         return []
 
+    # No order number anywhere means nothing extractable — don't pay for an LLM call
+    if not _RE_ORDER_NUM_LOOSE.search(clean_text):
+        logger.debug("No order-number pattern in email, skipping")
+        return []
+
     client = Anthropic(api_key=ANTHROPIC_API_KEY)
 
     prompt = render_template("amazon_order_parsing", clean_text=clean_text)
 
     try:
+        # Forced tool call: Claude returns schema-shaped input, no free-form JSON to dig out
         response = client.messages.create(
             model="claude-haiku-4-5-20251001",
             max_tokens=2000,
+            tools=[_ORDER_EXTRACTION_TOOL],
+            tool_choice={"type": "tool", "name": "extract_orders"},
             messages=[{"role": "user", "content": prompt}],
         )
 
-        text = response.content[0].text.strip()
-
-        # Parse as JSON array or single object
-        if "[" in text:
-            json_str = text[text.index("[") : text.rindex("]") + 1]
-            raw_orders = json.loads(json_str)
-        elif "{" in text:
-            json_str = text[text.index("{") : text.rindex("}") + 1]
-            raw_orders = [json.loads(json_str)]
-        else:
+        if response.stop_reason == "max_tokens":
+            # A truncated tool call can drop whole orders or items — never record a partial parse
+            logger.warning("Order extraction hit max_tokens, skipping email dated %s", email_date or "unknown")
             return []
 
+        tool_use = next((block for block in response.content if block.type == "tool_use"), None)
+        if tool_use is None:
+            return []
+        raw_orders = tool_use.input.get("orders") or []
         if not isinstance(raw_orders, list):
             raw_orders = [raw_orders]
 
@@ -376,7 +771,7 @@ def _parse_order_email(html_body: str, email_date: str = "") -> list[dict]:
 
             # Validate order number format
             order_num = order.get("order_number")
-            if order_num and not re.match(r"^\d{3}-\d{7}-\d{7}$", str(order_num)):
+            if order_num and not _RE_ORDER_NUM.match(str(order_num)):
                 logger.warning("Rejected invalid order number: %s", order_num)
                 order["order_number"] = None
 
@@ -425,6 +820,9 @@ def _parse_order_email(html_body: str, email_date: str = "") -> list[dict]:
 # ---------------------------------------------------------------------------
 
 
+_PARSE_CONCURRENCY = 8  # max simultaneous Claude email-parse calls
+
+
 def get_amazon_orders(days: int = 30) -> tuple[list[dict], bool]:
     """Fetch Amazon order data from Gmail order confirmation emails.
 
@@ -454,13 +852,17 @@ def get_amazon_orders(days: int = 30) -> tuple[list[dict], bool]:
             logger.info("No Amazon order emails found in last %d days", days)
             return [], False
 
-        orders = []
-        seen_order_numbers = set()
+        fetched = _batch_get_messages(service, [m["id"] for m in messages])
+
+        # Extract bodies + Date headers first (cheap), then parse with Claude concurrently
+        to_parse: list[tuple[str, str, str, str]] = []  # (email_id, plain_body, html_body, email_date)
         for msg_meta in messages:
+            msg = fetched.get(msg_meta["id"])
+            if msg is None:
+                continue
             try:
-                msg = service.users().messages().get(userId="me", id=msg_meta["id"], format="full").execute()
-                html_body = _extract_html_body(msg)
-                if not html_body:
+                plain_body, html_body = _extract_body(msg)
+                if not plain_body and not html_body:
                     continue
 
                 # Extract email Date header as order date
@@ -476,19 +878,35 @@ def get_amazon_orders(days: int = 30) -> tuple[list[dict], bool]:
                     except Exception:
                         pass
 
-                parsed_orders = _parse_order_email(html_body, email_date)
-                for parsed in parsed_orders:
-                    # Deduplicate by order number
-                    order_num = parsed.get("order_number", "")
-                    if order_num and order_num in seen_order_numbers:
-                        continue
-                    if order_num:
-                        seen_order_numbers.add(order_num)
-                    orders.append(parsed)
+                to_parse.append((msg_meta["id"], plain_body, html_body, email_date))
             except Exception as e:
                 logger.warning("Failed to process email %s: %s", msg_meta["id"], e)
                 continue
 
+        def _parse(entry: tuple[str, str, str, str]) -> list[dict]:
+            email_id, plain_body, html_body, email_date = entry
+            try:
+                return _parse_order_email(html_body, email_date, plain_text=plain_body)
+            except Exception as e:
+                logger.warning("Failed to process email %s: %s", email_id, e)
+                return []
+
+        # Each parse is a blocking LLM round trip — run them in parallel (results keep email order)
+        with ThreadPoolExecutor(max_workers=_PARSE_CONCURRENCY) as pool:
+            parsed_per_email = list(pool.map(_parse, to_parse))
+
+        orders = []
+        seen_order_numbers = set()
+        for parsed_orders in parsed_per_email:
+            for parsed in parsed_orders:
+                # Deduplicate by order number
+                order_num = parsed.get("order_number", "")
+                if order_num and order_num in seen_order_numbers:
+                    continue
+                if order_num:
+                    seen_order_numbers.add(order_num)
+                orders.append(parsed)
+
         logger.info(
             "Parsed %d Amazon orders from %d emails (last %d days)",
             len(orders),
@@ -509,7 +927,7 @@ def get_amazon_orders(days: int = 30) -> tuple[list[dict], bool]:
 # ---------------------------------------------------------------------------
 
 
-def find_amazon_transactions(days: int = 30) -> list[dict]:
+def find_amazon_transactions(days: int = 30, records: dict[str, dict] | None = None) -> list[dict]:
     """Fetch YNAB transactions with Amazon payee, filter out already-processed ones.
 
     Returns list of unprocessed transaction dicts with id, amount, date, memo, payee_name.
@@ -520,14 +938,15 @@ def find_amazon_transactions(days: int = 30) -> list[dict]:
     url = f"{ynab.BASE_URL}/budgets/{ynab.YNAB_BUDGET_ID}/transactions"
     resp = ynab._ynab_request("get", url, params={"since_date": since_date})
     resp.raise_for_status()
-    txns = resp.json()["data"]["transactions"]
+    txns = orjson.loads(resp.content)["data"]["transactions"]
 
-    # Filter to Amazon payees
+    # Filter to Amazon payees (load processed records once, not per transaction)
+    processed = records if records is not None else load_sync_records()
     amazon_txns = []
     for t in txns:
         payee = (t.get("payee_name") or "").lower()
         if "amazon" in payee or "amzn" in payee:
-            if not is_transaction_processed(t["id"]):
+            if t["id"] not in processed:
                 amazon_txns.append(
                     {
                         "id": t["id"],
@@ -559,57 +978,58 @@ def match_orders_to_transactions(
     Returns list of {ynab_transaction, matched_order, match_type} dicts.
     Unmatched transactions get matched_order=None.
     """
+    # Precompute each order's date ordinal and penny amounts once, and index orders
+    # by milliunit amount so each transaction only looks at same-amount candidates
+    # instead of scanning every order (hash join instead of O(T·O) nested loop).
+    order_ords: list[int | None] = []
+    by_amount: dict[int, list[int]] = {}
+    grand_total_milli: list[int | None] = []
+    for i, order in enumerate(amazon_orders):
+        order_ord = None
+        order_date_str = order.get("order_date")
+        if order_date_str:
+            # Parse order date (already ISO format from Claude parsing)
+            try:
+                order_ord = date.fromisoformat(order_date_str).toordinal()
+            except ValueError:
+                pass
+        order_ords.append(order_ord)
+
+        grand_total = order.get("grand_total")
+        gt_milli = int(round(abs(grand_total) * 1000)) if grand_total is not None else None
+        grand_total_milli.append(gt_milli)
+        amounts = {gt_milli} if gt_milli is not None else set()
+        # Shipment subtotals allow partial shipment matching
+        for shipment in order.get("shipments", []):
+            ship_total = shipment.get("total") or shipment.get("grand_total")
+            if ship_total is not None:
+                amounts.add(int(round(abs(ship_total) * 1000)))
+        for amt in amounts:
+            by_amount.setdefault(amt, []).append(i)
+
     results = []
     used_orders = set()  # Track order numbers already matched
 
     for txn in ynab_transactions:
         txn_amount = abs(txn["amount"])  # milliunits (positive)
-        txn_date = date.fromisoformat(txn["date"])
+        txn_ord = date.fromisoformat(txn["date"]).toordinal()
         matched_order = None
         match_type = "unmatched"
 
-        for order in amazon_orders:
+        # Candidates are in original order, so the first hit is the same order the scan would pick
+        for i in by_amount.get(txn_amount, ()):
+            order_ord = order_ords[i]
+            # Check date within ±3 days
+            if order_ord is None or abs(txn_ord - order_ord) > 3:
+                continue
+            order = amazon_orders[i]
             order_num = order.get("order_number", "") or ""
             if order_num in used_orders:
                 continue
-
-            order_date_str = order.get("order_date")
-            if not order_date_str:
-                continue
-
-            # Parse order date (already ISO format from Claude parsing)
-            try:
-                order_date = date.fromisoformat(order_date_str)
-            except ValueError:
-                continue
-
-            # Check date within ±3 days
-            day_diff = abs((txn_date - order_date).days)
-            if day_diff > 3:
-                continue
-
-            # Check exact penny match on grand_total
-            grand_total = order.get("grand_total")
-            if grand_total is not None:
-                order_amount_milli = int(round(abs(grand_total) * 1000))
-                if order_amount_milli == txn_amount:
-                    matched_order = order
-                    match_type = "grand_total"
-                    used_orders.add(order_num)
-                    break
-
-            # Try shipment subtotals for partial shipment matching
-            for shipment in order.get("shipments", []):
-                ship_total = shipment.get("total") or shipment.get("grand_total")
-                if ship_total is not None:
-                    ship_milli = int(round(abs(ship_total) * 1000))
-                    if ship_milli == txn_amount:
-                        matched_order = order
-                        match_type = "shipment"
-                        used_orders.add(order_num)
-                        break
-            if matched_order:
-                break
+            matched_order = order
+            match_type = "grand_total" if grand_total_milli[i] == txn_amount else "shipment"
+            used_orders.add(order_num)
+            break
 
         results.append(
             {
@@ -642,7 +1062,7 @@ def classify_item(
     Returns dict with category_name, category_id, confidence.
     """
     # 1. Check cached exact match
-    cached = lookup_cached_category(item_title)
+    cached = lookup_cached_category(item_title, past_mappings)
     if cached:
         return {
             "category_name": cached["category_name"],
@@ -709,131 +1129,213 @@ def classify_item(
     return {"category_name": "", "category_id": "", "confidence": 0.0}
 
 
+def classify_items_batch(
+    items: list[tuple[str, float]],
+    category_list: list[dict],
+    past_mappings: dict,
+) -> list[dict]:
+    """Classify several Amazon items with at most one Claude Haiku call.
+
+    Cached mappings are resolved first; all remaining items go into a single
+    prompt. Returns one {category_name, category_id, confidence} dict per
+    input item, in order (empty category when unclassified).
+    """
+    results: list[dict | None] = [None] * len(items)
+    to_classify: list[int] = []
+    for i, (title, _price) in enumerate(items):
+        cached = lookup_cached_category(title, past_mappings)
+        if cached:
+            results[i] = {
+                "category_name": cached["category_name"],
+                "category_id": cached["category_id"],
+                "confidence": min(cached.get("confidence", 0.9), 1.0),
+            }
+        else:
+            to_classify.append(i)
+
+    if to_classify:
+        try:
+            from anthropic import Anthropic
+
+            from src.config import ANTHROPIC_API_KEY
+
+            client = Anthropic(api_key=ANTHROPIC_API_KEY)
+
+            examples = [
+                f'  "{title}" → {mapping["category_name"]}' for title, mapping in list(past_mappings.items())[:10]
+            ]
+            examples_text = "\n".join(examples) if examples else "  (no past examples yet)"
+            items_text = "\n".join(f'  {n}. "{items[i][0]}" (${items[i][1]:.2f})' for n, i in enumerate(to_classify))
+
+            prompt = render_template(
+                "amazon_batch_classification",
+                category_list=", ".join(c["name"] for c in category_list),
+                examples_text=examples_text,
+                items_text=items_text,
+            )
+
+            response = client.messages.create(
+                model="claude-haiku-4-5-20251001",
+                max_tokens=100 + 60 * len(to_classify),
+                messages=[{"role": "user", "content": prompt}],
+            )
+
+            text = response.content[0].text.strip()
+            if "[" in text:
+                by_name = {c["name"].lower(): c for c in category_list}
+                for entry in json.loads(text[text.index("[") : text.rindex("]") + 1]):
+                    if not isinstance(entry, dict):
+                        continue
+                    n = entry.get("index")
+                    cat = by_name.get(str(entry.get("category", "")).lower())
+                    if isinstance(n, int) and 0 <= n < len(to_classify) and cat:
+                        results[to_classify[n]] = {
+                            "category_name": cat["name"],  # Use canonical name
+                            "category_id": cat["id"],
+                            "confidence": float(entry.get("confidence", 0.5)),
+                        }
+        except Exception as e:
+            logger.error("Batch LLM classification failed for %d items: %s", len(to_classify), e)
+
+    # Fallback — empty (caller handles unclassified items)
+    return [r or {"category_name": "", "category_id": "", "confidence": 0.0} for r in results]
+
+
 # ---------------------------------------------------------------------------
 # T011: Enrich memos and classify matched transactions
 # ---------------------------------------------------------------------------
 
 
-def enrich_and_classify(matched_transactions: list[dict]) -> list[dict]:
+def enrich_and_classify(matched_transactions: list[dict], ctx: _SyncContext | None = None) -> list[dict]:
     """For each matched transaction: update memo, classify items, handle single-item auto-split.
 
     Returns enriched list with classification results added.
     """
     from src.tools import ynab
 
+    if ctx is None:
+        ctx = _load_sync_context()
     categories = ynab._get_categories()
     cat_list = [{"id": c["id"], "name": c["name"]} for c in categories.values()]
-    past_mappings = load_category_mappings()
+    past_mappings = ctx.category_mappings
 
     enriched = []
-    for match in matched_transactions:
-        txn = match["ynab_transaction"]
-        order = match["matched_order"]
-
-        if order is None:
-            # Check if this is a refund (positive amount = inflow)
-            if txn["amount"] > 0:
-                refund_result = match_refund(txn)
-                if refund_result:
-                    match["refund_result"] = refund_result
+    new_records: list[SyncRecord] = []  # flushed in one write at the end
+    try:
+        for match in matched_transactions:
+            txn = match["ynab_transaction"]
+            order = match["matched_order"]
+
+            if order is None:
+                # Check if this is a refund (positive amount = inflow)
+                if txn["amount"] > 0:
+                    refund_result = match_refund(txn, ctx.records)
+                    if refund_result:
+                        match["refund_result"] = refund_result
+                        enriched.append(match)
+                        continue
+
+                # Try known charge patterns for unmatched transactions (T030)
+                pattern_result = handle_known_charge_patterns(txn, ctx.config)
+                if pattern_result:
+                    match["pattern_result"] = pattern_result
                     enriched.append(match)
                     continue
 
-            # Try known charge patterns for unmatched transactions (T030)
-            pattern_result = handle_known_charge_patterns(txn)
-            if pattern_result:
-                match["pattern_result"] = pattern_result
+                # Truly unmatched
                 enriched.append(match)
                 continue
 
-            # Truly unmatched
-            enriched.append(match)
-            continue
-
-        items = order.get("items", []) or []
-        if not items:
-            enriched.append(match)
-            continue
+            items = order.get("items", []) or []
+            if not items:
+                enriched.append(match)
+                continue
 
-        # Build item names for memo
-        item_names = []
-        classified_items = []
-        for item in items:
-            title = item.get("title", "") or "Unknown item"
-            price = item.get("price", 0) or 0
-            qty = item.get("quantity", 1) or 1
-            item_names.append(title[:50])  # Truncate long titles
-
-            classification = classify_item(title, price, cat_list, past_mappings)
-            classified_items.append(
-                MatchedItem(
-                    title=title,
-                    price=float(price),
-                    quantity=qty,
-                    seller=item.get("seller", "") or "",
-                    classified_category=classification["category_name"],
-                    classified_category_id=classification["category_id"],
-                    confidence=classification["confidence"],
+            # Build item names for memo
+            item_names = []
+            classified_items = []
+            titles = [item.get("title", "") or "Unknown item" for item in items]
+            prices = [item.get("price", 0) or 0 for item in items]
+            # One LLM call per order instead of one per item
+            classifications = classify_items_batch(list(zip(titles, prices)), cat_list, past_mappings)
+            for item, title, price, classification in zip(items, titles, prices, classifications):
+                qty = item.get("quantity", 1) or 1
+                item_names.append(title[:50])  # Truncate long titles
+
+                classified_items.append(
+                    MatchedItem(
+                        title=title,
+                        title_normalized=title.lower().strip(),
+                        price=float(price),
+                        quantity=qty,
+                        seller=item.get("seller", "") or "",
+                        classified_category=classification["category_name"],
+                        classified_category_id=classification["category_id"],
+                        confidence=classification["confidence"],
+                    )
                 )
-            )
 
-        # Update memo with item names (T005)
-        memo_text = ", ".join(item_names)
-        if len(memo_text) > 150:
-            memo_text = memo_text[:147] + "..."
-        ynab.update_transaction_memo(txn["id"], memo_text)
-
-        # Proportional tax/shipping allocation (FR-010)
-        total_item_price = sum(ci.price * ci.quantity for ci in classified_items)
-        txn_total = abs(txn["amount"])  # milliunits
-        for ci in classified_items:
-            if total_item_price > 0:
-                proportion = (ci.price * ci.quantity) / total_item_price
-            else:
-                proportion = 1.0 / len(classified_items)
-            ci.allocated_amount = int(round(txn_total * proportion))
-
-        # Ensure amounts sum exactly to transaction total
-        allocated_sum = sum(ci.allocated_amount for ci in classified_items)
-        if classified_items and allocated_sum != txn_total:
-            classified_items[-1].allocated_amount += txn_total - allocated_sum
-
-        # Create sync record
-        now = datetime.now().isoformat()
-        record = SyncRecord(
-            ynab_transaction_id=txn["id"],
-            amazon_order_number=order.get("order_number", "") or "",
-            status="enriched",
-            matched_at=now,
-            enriched_at=now,
-            ynab_amount=txn["amount"],
-            ynab_date=txn["date"],
-            items=[asdict(ci) for ci in classified_items],
-            original_memo=txn.get("memo") or "",
-            original_category_id=txn.get("category_id") or "",
-        )
-
-        # Single-item orders: auto-categorize directly (FR-006)
-        if len(classified_items) == 1 and classified_items[0].classified_category_id:
-            ci = classified_items[0]
-            ynab.split_transaction(
-                txn["id"],
-                [
-                    {
-                        "amount_milliunits": txn["amount"],  # Keep original sign
-                        "category_id": ci.classified_category_id,
-                        "memo": ci.title[:200],
-                    }
-                ],
+            # Update memo with item names (T005)
+            memo_text = ", ".join(item_names)
+            if len(memo_text) > 150:
+                memo_text = memo_text[:147] + "..."
+            ynab.update_transaction_memo(txn["id"], memo_text)
+
+            # Proportional tax/shipping allocation (FR-010) — one pass that also tracks the sum
+            line_totals = [ci.price * ci.quantity for ci in classified_items]
+            total_item_price = sum(line_totals)
+            txn_total = abs(txn["amount"])  # milliunits
+            even_share = 1.0 / len(classified_items)
+            allocated_sum = 0
+            for ci, line_total in zip(classified_items, line_totals):
+                proportion = line_total / total_item_price if total_item_price > 0 else even_share
+                ci.allocated_amount = int(round(txn_total * proportion))
+                allocated_sum += ci.allocated_amount
+
+            # Ensure amounts sum exactly to transaction total
+            if classified_items and allocated_sum != txn_total:
+                classified_items[-1].allocated_amount += txn_total - allocated_sum
+
+            # Create sync record
+            now = datetime.now().isoformat()
+            record = SyncRecord(
+                ynab_transaction_id=txn["id"],
+                amazon_order_number=order.get("order_number", "") or "",
+                status="enriched",
+                matched_at=now,
+                enriched_at=now,
+                ynab_amount=txn["amount"],
+                ynab_date=txn["date"],
+                items=[asdict(ci) for ci in classified_items],
+                original_memo=txn.get("memo") or "",
+                original_category_id=txn.get("category_id") or "",
             )
-            record.status = "auto_split"
-            record.split_applied_at = now
-            logger.info("Auto-categorized single-item order: %s → %s", ci.title, ci.classified_category)
 
-        save_sync_record(record)
-        match["classified_items"] = classified_items
-        match["sync_record"] = record
-        enriched.append(match)
+            # Single-item orders: auto-categorize directly (FR-006)
+            if len(classified_items) == 1 and classified_items[0].classified_category_id:
+                ci = classified_items[0]
+                ynab.split_transaction(
+                    txn["id"],
+                    [
+                        {
+                            "amount_milliunits": txn["amount"],  # Keep original sign
+                            "category_id": ci.classified_category_id,
+                            "memo": ci.title[:200],
+                        }
+                    ],
+                )
+                record.status = "auto_split"
+                record.split_applied_at = now
+                logger.info("Auto-categorized single-item order: %s → %s", ci.title, ci.classified_category)
+
+            new_records.append(record)
+            match["classified_items"] = classified_items
+            match["sync_record"] = record
+            enriched.append(match)
+    finally:
+        # Records guard against re-processing already-split transactions, so flush
+        # whatever was enriched even if a later transaction raised.
+        save_sync_records(new_records)
 
     return enriched
 
@@ -843,14 +1345,25 @@ def enrich_and_classify(matched_transactions: list[dict]) -> list[dict]:
 # ---------------------------------------------------------------------------
 
 
+# Bound str.format for one item row: title, category, dollars, low-confidence marker
+_SUGGESTION_ITEM_LINE = "  • {} → {} (${:.2f}){}".format
+
+
 def format_suggestion_message(enriched_transactions: list[dict]) -> str:
     """Build consolidated WhatsApp message with split suggestions.
 
     Returns formatted message string, or empty string if nothing to suggest.
     """
-    suggestions = []  # multi-item transactions needing approval
+    # Only unmatched charges and transactions with classified items produce output
+    # (large-purchase tips also come from classified items) — bail out before any work.
+    if not any(m["matched_order"] is None or m.get("classified_items") for m in enriched_transactions):
+        return ""
+
+    suggestion_lines = []  # multi-item transactions needing approval (flat, joined once at the end)
+    suggestion_count = 0
     auto_splits = []  # single-item auto-categorized
     unmatched = []  # couldn't match to Amazon order
+    pending_records: list[SyncRecord] = []  # flushed in one write below
 
     for match in enriched_transactions:
         txn = match["ynab_transaction"]
@@ -861,14 +1374,14 @@ def format_suggestion_message(enriched_transactions: list[dict]) -> str:
             if items:
                 ci = items[0]
                 auto_splits.append(
-                    f"• ${abs(txn['amount']) / 1000:.2f} ({txn['date']}) — {ci.title[:40]}\n"
+                    f"• ${_dollars(txn['amount']):.2f} ({txn['date']}) — {ci.title[:40]}\n"
                     f"  ✅ Auto-categorized → {ci.classified_category}"
                 )
             continue
 
         if match["matched_order"] is None:
             unmatched.append(
-                f"• ${abs(txn['amount']) / 1000:.2f} ({txn['date']}) — unmatched\n"
+                f"• ${_dollars(txn['amount']):.2f} ({txn['date']}) — unmatched\n"
                 f'  Tagged as "Unmatched Amazon charge" — what category?'
             )
             continue
@@ -878,32 +1391,39 @@ def format_suggestion_message(enriched_transactions: list[dict]) -> str:
             continue
 
         # Multi-item suggestion
-        idx = len(suggestions) + 1
-        lines = [f"{idx}️⃣ ${abs(txn['amount']) / 1000:.2f} ({txn['date']}) — {len(items)} items:"]
-        for ci in items:
-            amt = abs(ci.allocated_amount) / 1000
-            uncertain = " ⚠️" if ci.confidence < 0.7 else ""
-            lines.append(f"  • {ci.title[:40]} → {ci.classified_category} (${amt:.2f}){uncertain}")
+        suggestion_count += 1
+        idx = suggestion_count
+        suggestion_lines.append(f"{idx}️⃣ ${_dollars(txn['amount']):.2f} ({txn['date']}) — {len(items)} items:")
+        suggestion_lines.extend(
+            _SUGGESTION_ITEM_LINE(
+                ci.title[:40],
+                ci.classified_category,
+                _dollars(ci.allocated_amount),
+                " ⚠️" if ci.confidence < 0.7 else "",
+            )
+            for ci in items
+        )
 
-        lines.append(f'Reply "{idx} yes" to split, "{idx} adjust" to modify, "{idx} skip" to leave as-is')
-        suggestions.append("\n".join(lines))
+        suggestion_lines.append(f'Reply "{idx} yes" to split, "{idx} adjust" to modify, "{idx} skip" to leave as-is')
 
         # Update record to split_pending
         if record:
             record.status = "split_pending"
-            save_sync_record(record)
+            pending_records.append(record)
+
+    save_sync_records(pending_records)
 
     # Large purchase tips (T027)
     large_tips = check_large_purchases(enriched_transactions)
 
-    if not suggestions and not auto_splits and not unmatched and not large_tips:
+    if not suggestion_count and not auto_splits and not unmatched and not large_tips:
         return ""
 
     parts = ["📦 Amazon Sync"]
-    if suggestions:
-        parts[0] += f" — {len(suggestions)} need review"
+    if suggestion_count:
+        parts[0] += f" — {suggestion_count} need review"
         parts.append("")
-        parts.extend(suggestions)
+        parts.extend(suggestion_lines)
     if auto_splits:
         parts.append("")
         parts.extend(auto_splits)
@@ -921,10 +1441,19 @@ def format_suggestion_message(enriched_transactions: list[dict]) -> str:
 # T013: Handle Partner 2's reply to sync suggestions
 # ---------------------------------------------------------------------------
 
-# Persistent storage for pending suggestions (survives container restarts)
+# Persistent storage for pending suggestions (survives container restarts).
+# Each entry embeds its sync record, so replies are resolved from this small file
+# alone; entries are dropped as soon as a reply settles them.
 _PENDING_SUGGESTIONS_FILE = _DATA_DIR / "amazon_pending_suggestions.json"
 
 
+def _write_pending_suggestions(entries: list[dict]) -> None:
+    """Write the pending-suggestions file atomically (tmp-file + rename)."""
+    tmp = _PENDING_SUGGESTIONS_FILE.with_suffix(".tmp")
+    tmp.write_bytes(orjson.dumps(entries, default=str, option=orjson.OPT_INDENT_2))
+    tmp.replace(_PENDING_SUGGESTIONS_FILE)
+
+
 def set_pending_suggestions(enriched_transactions: list[dict]) -> None:
     """Store pending suggestions to disk so replies can reference them by index."""
     pending = [m for m in enriched_transactions if m.get("sync_record") and m["sync_record"].status == "split_pending"]
@@ -935,43 +1464,67 @@ def set_pending_suggestions(enriched_transactions: list[dict]) -> None:
             {
                 "ynab_transaction": m["ynab_transaction"],
                 "sync_record_id": m["sync_record"].ynab_transaction_id,
+                "sync_record": vars(m["sync_record"]).copy(),
                 "classified_items": [asdict(ci) for ci in m.get("classified_items", [])],
             }
         )
-    _PENDING_SUGGESTIONS_FILE.write_text(json.dumps(serialized, indent=2))
+    _write_pending_suggestions(serialized)
     logger.info("Saved %d pending suggestions to disk", len(serialized))
 
 
-def _load_pending_suggestions() -> list[dict]:
+def _drop_pending_suggestion(ynab_transaction_id: str) -> None:
+    """Remove a settled suggestion from the pending file (later indexes shift down)."""
+    try:
+        entries = orjson.loads(_PENDING_SUGGESTIONS_FILE.read_bytes())
+        remaining = [e for e in entries if e.get("sync_record_id") != ynab_transaction_id]
+        if len(remaining) != len(entries):
+            _write_pending_suggestions(remaining)
+    except Exception as e:
+        logger.warning("Failed to update pending suggestions: %s", e)
+
+
+@dataclass
+class _PendingSuggestions:
+    """Pending suggestions in reply order, plus the same entries by YNAB transaction ID."""
+
+    ordered: list[dict] = field(default_factory=list)  # "N yes" → ordered[N - 1]
+    by_id: dict[str, dict] = field(default_factory=dict)
+
+
+def _load_pending_suggestions() -> _PendingSuggestions:
     """Load pending suggestions from disk, reconstructing dataclass objects."""
+    result = _PendingSuggestions()
     if not _PENDING_SUGGESTIONS_FILE.exists():
-        return []
+        return result
     try:
-        data = json.loads(_PENDING_SUGGESTIONS_FILE.read_text())
-        result = []
+        data = orjson.loads(_PENDING_SUGGESTIONS_FILE.read_bytes())
         for entry in data:
             # Reconstruct MatchedItem objects
             items = [MatchedItem(**ci) for ci in entry.get("classified_items", [])]
-            # Reconstruct SyncRecord from saved records
-            record = load_sync_record(entry["sync_record_id"])
+            # Reconstruct SyncRecord from the embedded copy (older files only stored the ID)
+            if "sync_record" in entry:
+                record = SyncRecord(**entry["sync_record"])
+            else:
+                record = load_sync_record(entry["sync_record_id"])
             if record and record.status == "split_pending":
-                result.append(
-                    {
-                        "ynab_transaction": entry["ynab_transaction"],
-                        "sync_record": record,
-                        "classified_items": items,
-                    }
-                )
+                match = {
+                    "ynab_transaction": entry["ynab_transaction"],
+                    "sync_record": record,
+                    "classified_items": items,
+                }
+                result.ordered.append(match)
+                result.by_id[record.ynab_transaction_id] = match
         return result
     except Exception as e:
         logger.warning("Failed to load pending suggestions: %s", e)
-        return []
+        return _PendingSuggestions()
 
 
 def handle_sync_reply(message_text: str) -> str:
     """Parse Partner 2's reply to a sync suggestion and apply the action.
 
-    Supports: "N yes", "N adjust — [correction]", "N skip", "yes" (if only one pending).
+    Supports: "N yes", "N adjust — [correction]", "N skip", "yes" (if only one pending),
+    and the same actions prefixed with a YNAB transaction ID instead of N.
     """
     from src.tools import ynab
 
@@ -989,16 +1542,21 @@ def handle_sync_reply(message_text: str) -> str:
     # Handle single pending shorthand ("yes", "skip")
     idx = 1
     action = text
-    if parts[0].isdigit():
-        idx = int(parts[0])
+    match = pending.by_id.get(parts[0])
+    if match is not None:
         action = parts[1] if len(parts) > 1 else ""
-    elif len(pending) != 1:
-        return ""  # Can't determine which transaction
+    else:
+        if parts[0].isdigit():
+            idx = int(parts[0])
+            action = parts[1] if len(parts) > 1 else ""
+        elif len(pending.ordered) != 1:
+            return ""  # Can't determine which transaction
+
+        if idx < 1 or idx > len(pending.ordered):
+            return f"Transaction #{idx} not found. Valid range: 1-{len(pending.ordered)}."
 
-    if idx < 1 or idx > len(pending):
-        return f"Transaction #{idx} not found. Valid range: 1-{len(pending)}."
+        match = pending.ordered[idx - 1]
 
-    match = pending[idx - 1]
     txn = match["ynab_transaction"]
     record = match.get("sync_record")
     items = match.get("classified_items", [])
@@ -1023,12 +1581,13 @@ def handle_sync_reply(message_text: str) -> str:
         record.status = "split_applied"
         record.split_applied_at = now
         save_sync_record(record)
+        _drop_pending_suggestion(record.ynab_transaction_id)
 
         # Save mappings as user_approved
-        for ci in items:
-            save_category_mapping(
+        save_category_mappings(
+            [
                 CategoryMapping(
-                    item_title_normalized=ci.title.lower().strip(),
+                    item_title_normalized=ci.title_normalized or ci.title.lower().strip(),
                     category_name=ci.classified_category,
                     category_id=ci.classified_category_id,
                     confidence=max(ci.confidence, 0.9),
@@ -1036,7 +1595,9 @@ def handle_sync_reply(message_text: str) -> str:
                     times_used=1,
                     last_used=now,
                 )
-            )
+                for ci in items
+            ]
+        )
 
         # Update acceptance stats
         config.total_suggestions += 1
@@ -1045,11 +1606,12 @@ def handle_sync_reply(message_text: str) -> str:
             config.first_suggestion_date = date.today().isoformat()
         save_sync_config(config)
 
-        return f"✅ Split applied for ${abs(txn['amount']) / 1000:.2f} Amazon order ({len(items)} items)."
+        return f"✅ Split applied for ${_dollars(txn['amount']):.2f} Amazon order ({len(items)} items)."
 
     elif action.startswith("skip"):
         record.status = "skipped"
         save_sync_record(record)
+        _drop_pending_suggestion(record.ynab_transaction_id)
         config.total_suggestions += 1
         config.skips += 1
         if not config.first_suggestion_date:
@@ -1063,6 +1625,7 @@ def handle_sync_reply(message_text: str) -> str:
         record.status = "split_applied"
         record.split_applied_at = now
         save_sync_record(record)
+        _drop_pending_suggestion(record.ynab_transaction_id)
 
         config.total_suggestions += 1
         config.modified_accepts += 1
@@ -1091,8 +1654,9 @@ def get_sync_status() -> str:
     records = load_sync_records()
 
     total = len(records)
-    matched = sum(1 for r in records.values() if r.get("status") not in ("unmatched",))
-    split = sum(1 for r in records.values() if r.get("status") in ("split_applied", "auto_split"))
+    by_status = _records_index(records).by_status
+    matched = total - len(by_status.get("unmatched", ()))
+    split = sum(len(by_status.get(status, ())) for status in _APPLIED_STATUSES)
 
     acceptance_rate = 0
     total_sug = config.total_suggestions
@@ -1130,8 +1694,12 @@ def run_nightly_sync() -> str | None:
     Errors are logged but never returned as user-facing messages (US2-AS4).
     """
     try:
+        # Config, records and mappings are read once and shared by every step below
+        ctx = _load_sync_context()
+        config = ctx.config
+
         # Check YNAB first (fast) — skip email parsing if nothing to process
-        txns = find_amazon_transactions()
+        txns = find_amazon_transactions(records=ctx.records)
         if not txns:
             logger.info("Nightly sync: no new transactions to process")
             return None
@@ -1146,10 +1714,9 @@ def run_nightly_sync() -> str | None:
 
         # Match and enrich
         matched = match_orders_to_transactions(txns, orders)
-        enriched = enrich_and_classify(matched)
+        enriched = enrich_and_classify(matched, ctx)
 
         # Check for auto-split mode (US3)
-        config = load_sync_config()
         if config.auto_split_enabled:
             return _run_auto_split(enriched, config)
 
@@ -1157,11 +1724,12 @@ def run_nightly_sync() -> str | None:
         message = format_suggestion_message(enriched)
         set_pending_suggestions(enriched)
 
-        # Timeout sweep — mark old pending suggestions as skipped (T031)
-        _sweep_timed_out_suggestions()
+        # Timeout sweep — mark old pending suggestions as skipped (T031).
+        # Counters go onto this run's config, saved once below.
+        _sweep_timed_out_suggestions(config, ctx.records)
 
         # Check auto-split graduation (T021)
-        graduation_msg = check_auto_split_graduation()
+        graduation_msg = check_auto_split_graduation(config)
         if graduation_msg:
             message = (message + "\n\n" + graduation_msg) if message else graduation_msg
 
@@ -1185,8 +1753,11 @@ def _run_auto_split(enriched: list[dict], config: SyncConfig) -> str | None:
     """
     from src.tools import ynab
 
+    now = datetime.now().isoformat()  # one timestamp for the whole pass
     auto_split_lines = []
     needs_suggestion = []  # low-confidence transactions fall back to suggestions
+    split_records: list[SyncRecord] = []  # flushed in one write after the loop
+    to_split: list[tuple[dict, list[dict]]] = []  # (match, subtransactions)
 
     for match in enriched:
         txn = match["ynab_transaction"]
@@ -1200,7 +1771,7 @@ def _run_auto_split(enriched: list[dict], config: SyncConfig) -> str | None:
         if record.status == "auto_split":
             ci = items[0]
             auto_split_lines.append(
-                f"  • {ci.title[:40]} → {ci.classified_category} (${abs(ci.allocated_amount) / 1000:.2f})"
+                f"  • {ci.title[:40]} → {ci.classified_category} (${_dollars(ci.allocated_amount):.2f})"
             )
             continue
 
@@ -1212,7 +1783,7 @@ def _run_auto_split(enriched: list[dict], config: SyncConfig) -> str | None:
             needs_suggestion.append(match)
             continue
 
-        # All items high confidence — auto-split
+        # All items high confidence — auto-split (queued for one bulk YNAB request)
         subs = []
         for ci in items:
             subs.append(
@@ -1222,14 +1793,28 @@ def _run_auto_split(enriched: list[dict], config: SyncConfig) -> str | None:
                     "memo": ci.title[:200],
                 }
             )
+        to_split.append((match, subs))
 
+    # Anything the bulk request didn't confirm is retried with a per-transaction split
+    split_ids: set[str] = set()
+    if to_split:
+        try:
+            split_ids = ynab.split_transactions_bulk([(m["ynab_transaction"]["id"], subs) for m, subs in to_split])
+        except Exception as e:
+            logger.warning("Bulk auto-split failed, falling back to per-transaction splits: %s", e)
+
+    for match, subs in to_split:
+        txn = match["ynab_transaction"]
+        record = match["sync_record"]
+        items = match["classified_items"]
         try:
-            ynab.split_transaction(txn["id"], subs)
+            if txn["id"] not in split_ids:
+                ynab.split_transaction(txn["id"], subs)
             record.status = "auto_split"
-            record.split_applied_at = datetime.now().isoformat()
-            save_sync_record(record)
+            record.split_applied_at = now
+            split_records.append(record)
 
-            amt = abs(txn["amount"]) / 1000
+            amt = _dollars(txn["amount"])
             item_summary = ", ".join(f"{ci.title[:30]} → {ci.classified_category}" for ci in items)
             auto_split_lines.append(f"  • ${amt:.2f}: {item_summary}")
 
@@ -1239,6 +1824,8 @@ def _run_auto_split(enriched: list[dict], config: SyncConfig) -> str | None:
         except Exception as e:
             logger.error("Auto-split failed for %s: %s", txn["id"], e)
 
+    save_sync_records(split_records)
+
     # Build summary message
     parts = []
     if auto_split_lines:
@@ -1253,31 +1840,40 @@ def _run_auto_split(enriched: list[dict], config: SyncConfig) -> str | None:
             parts.append("")
             parts.append(suggestion_msg)
 
-    config.last_sync = datetime.now().isoformat()
+    config.last_sync = now
     save_sync_config(config)
     return "\n".join(parts) if parts else None
 
 
-def _sweep_timed_out_suggestions() -> None:
-    """Mark pending suggestions older than 24 hours as skipped (T031)."""
-    records = load_sync_records()
+def _sweep_timed_out_suggestions(config: SyncConfig | None = None, records: dict[str, dict] | None = None) -> None:
+    """Mark pending suggestions older than 24 hours as skipped (T031).
+
+    When the caller passes its ``config``, counters are updated in memory and the
+    caller is responsible for saving; otherwise the config is loaded and saved here.
+    """
+    if records is None:
+        records = load_sync_records()
     cutoff = (datetime.now() - timedelta(hours=24)).isoformat()
-    config = load_sync_config()
-    updated = False
+    owns_config = config is None
+    if owns_config:
+        config = load_sync_config()
+    timed_out: dict[str, dict] = {}
+
+    # enriched_at is always written by datetime.isoformat(), so the ISO strings
+    # order the same as the datetimes and need no parsing.
+    for txn_id in _records_index(records).by_status.get("split_pending", ()):
+        record = records[txn_id]
+        enriched_at = record.get("enriched_at", "")
+        if enriched_at and enriched_at < cutoff:
+            timed_out[txn_id] = {**record, "status": "skipped"}
+            config.total_suggestions += 1
+            config.skips += 1
+            logger.info("Timed out pending suggestion for %s", txn_id)
 
-    for txn_id, record in records.items():
-        if record.get("status") == "split_pending":
-            enriched_at = record.get("enriched_at", "")
-            if enriched_at and enriched_at < cutoff:
-                record["status"] = "skipped"
-                config.total_suggestions += 1
-                config.skips += 1
-                updated = True
-                logger.info("Timed out pending suggestion for %s", txn_id)
-
-    if updated:
-        _save_json(_SYNC_RECORDS_FILE, records)
-        save_sync_config(config)
+    if timed_out:
+        _append_sync_records(timed_out)
+        if owns_config:
+            save_sync_config(config)
 
 
 # ---------------------------------------------------------------------------
@@ -1285,9 +1881,10 @@ def _sweep_timed_out_suggestions() -> None:
 # ---------------------------------------------------------------------------
 
 
-def get_acceptance_rate() -> float:
+def get_acceptance_rate(config: SyncConfig | None = None) -> float:
     """Calculate unmodified acceptance rate (0.0-1.0)."""
-    config = load_sync_config()
+    if config is None:
+        config = load_sync_config()
     if config.total_suggestions == 0:
         return 0.0
     return config.unmodified_accepts / config.total_suggestions
@@ -1298,7 +1895,7 @@ def get_acceptance_rate() -> float:
 # ---------------------------------------------------------------------------
 
 
-def check_auto_split_graduation() -> str | None:
+def check_auto_split_graduation(config: SyncConfig | None = None) -> str | None:
     """Check if acceptance rate qualifies for auto-split graduation.
 
     Criteria: 14+ days since first suggestion, 80%+ acceptance rate,
@@ -1306,7 +1903,8 @@ def check_auto_split_graduation() -> str | None:
 
     Returns WhatsApp message if graduation prompt should be sent, else None.
     """
-    config = load_sync_config()
+    if config is None:
+        config = load_sync_config()
 
     if config.auto_split_enabled:
         return None
@@ -1319,7 +1917,7 @@ def check_auto_split_graduation() -> str | None:
     if days_since < 14:
         return None
 
-    rate = get_acceptance_rate()
+    rate = get_acceptance_rate(config)
     if rate < 0.8:
         return None
 
@@ -1337,7 +1935,7 @@ def set_auto_split(enabled: bool) -> str:
 
     if enabled and not config.auto_split_enabled:
         # Validate qualification
-        rate = get_acceptance_rate()
+        rate = get_acceptance_rate(config)
         if config.total_suggestions < 10 or rate < 0.8:
             return (
                 f"Auto-split requires 80%+ acceptance rate over 10+ suggestions. "
@@ -1364,7 +1962,7 @@ def handle_undo(transaction_index: int) -> str:
 
     records = load_sync_records()
     # Get recent auto-split records (for undo referencing)
-    auto_splits = [(txn_id, r) for txn_id, r in records.items() if r.get("status") == "auto_split"]
+    auto_splits = [(txn_id, records[txn_id]) for txn_id in _records_index(records).by_status.get("auto_split", ())]
 
     if not auto_splits:
         return "No auto-split transactions found to undo."
@@ -1389,13 +1987,11 @@ def handle_undo(transaction_index: int) -> str:
             ynab.update_transaction_memo(txn_id, original_memo or "")
 
         # Update record status
-        record["status"] = "undone"
-        records[txn_id] = record
-        _save_json(_SYNC_RECORDS_FILE, records)
+        _append_sync_records({txn_id: {**record, "status": "undone"}})
 
         return (
             f"↩️ Undo complete — reverted split on "
-            f"${abs(record.get('ynab_amount', 0)) / 1000:.2f} transaction. "
+            f"${_dollars(record.get('ynab_amount', 0)):.2f} transaction. "
             f"You can re-categorize manually in YNAB."
         )
 
@@ -1409,7 +2005,13 @@ def handle_undo(transaction_index: int) -> str:
 # ---------------------------------------------------------------------------
 
 
-def match_refund(txn: dict) -> str | None:
+@lru_cache(maxsize=1024)
+def _parse_ynab_date(iso_date: str) -> date:
+    """date.fromisoformat, memoized — records share a small set of distinct dates."""
+    return date.fromisoformat(iso_date)
+
+
+def match_refund(txn: dict, records: dict[str, dict] | None = None) -> str | None:
     """Match a refund (positive Amazon transaction) to an original purchase.
 
     Tries exact amount match, then item-level partial refund match.
@@ -1419,51 +2021,55 @@ def match_refund(txn: dict) -> str | None:
 
     refund_amount = abs(txn["amount"])  # milliunits
     txn_date = date.fromisoformat(txn["date"])
-    records = load_sync_records()
+    if records is None:
+        records = load_sync_records()
+
+    index = _records_index(records)
 
     # Try exact match to original purchase amount
-    for txn_id, record in records.items():
-        if record.get("status") not in ("split_applied", "auto_split"):
+    for txn_id in index.by_amount.get(refund_amount, ()):
+        record = records[txn_id]
+        if record.get("status") not in _APPLIED_STATUSES:
             continue
-        if abs(record.get("ynab_amount", 0)) == refund_amount:
-            rec_date = record.get("ynab_date", "")
-            if rec_date:
-                day_diff = abs((txn_date - date.fromisoformat(rec_date)).days)
-                if day_diff <= 60:  # refunds can take a while
-                    # Apply refund to same categories
-                    items = record.get("items", [])
-                    if items and len(items) == 1:
-                        cat_id = items[0].get("classified_category_id", "")
-                        if cat_id:
-                            ynab.split_transaction(
-                                txn["id"],
-                                [
-                                    {
-                                        "amount_milliunits": txn["amount"],
-                                        "category_id": cat_id,
-                                        "memo": f"Refund: {items[0].get('title', '')[:150]}",
-                                    }
-                                ],
-                            )
-                    # Record refund
-                    save_sync_record(
-                        SyncRecord(
-                            ynab_transaction_id=txn["id"],
-                            amazon_order_number=record.get("amazon_order_number", ""),
-                            status="refund_applied",
-                            matched_at=datetime.now().isoformat(),
-                            ynab_amount=txn["amount"],
-                            ynab_date=txn["date"],
-                            items=items,
+        rec_date = record.get("ynab_date", "")
+        if rec_date:
+            day_diff = abs((txn_date - _parse_ynab_date(rec_date)).days)
+            if day_diff <= 60:  # refunds can take a while
+                # Apply refund to same categories
+                items = record.get("items", [])
+                if items and len(items) == 1:
+                    cat_id = items[0].get("classified_category_id", "")
+                    if cat_id:
+                        ynab.split_transaction(
+                            txn["id"],
+                            [
+                                {
+                                    "amount_milliunits": txn["amount"],
+                                    "category_id": cat_id,
+                                    "memo": f"Refund: {items[0].get('title', '')[:150]}",
+                                }
+                            ],
                         )
+                # Record refund
+                save_sync_record(
+                    SyncRecord(
+                        ynab_transaction_id=txn["id"],
+                        amazon_order_number=record.get("amazon_order_number", ""),
+                        status="refund_applied",
+                        matched_at=datetime.now().isoformat(),
+                        ynab_amount=txn["amount"],
+                        ynab_date=txn["date"],
+                        items=items,
                     )
-                    return (
-                        f"↩️ Refund of ${refund_amount / 1000:.2f} matched to original order — applied to same category."
-                    )
+                )
+                return (
+                    f"↩️ Refund of ${_dollars(refund_amount):.2f} matched to original order — applied to same category."
+                )
 
     # Try item-level partial refund match
-    for txn_id, record in records.items():
-        if record.get("status") not in ("split_applied", "auto_split"):
+    for txn_id in index.by_item_amount.get(refund_amount, ()):
+        record = records[txn_id]
+        if record.get("status") not in _APPLIED_STATUSES:
             continue
         for item in record.get("items", []):
             item_amt = abs(item.get("allocated_amount", 0))
@@ -1492,7 +2098,7 @@ def match_refund(txn: dict) -> str | None:
                     )
                 )
                 return (
-                    f"↩️ Partial refund of ${refund_amount / 1000:.2f} "
+                    f"↩️ Partial refund of ${_dollars(refund_amount):.2f} "
                     f"matched — applied to "
                     f"{item.get('classified_category', 'original category')}."
                 )
@@ -1505,27 +2111,37 @@ def match_refund(txn: dict) -> str | None:
 # ---------------------------------------------------------------------------
 
 
-def handle_known_charge_patterns(txn: dict) -> str | None:
+@lru_cache(maxsize=8)
+def _charge_pattern_regex(patterns: tuple[str, ...]) -> re.Pattern:
+    """Compile one alternation over all known charge patterns (cached per pattern set)."""
+    return re.compile("|".join(map(re.escape, patterns)))
+
+
+def handle_known_charge_patterns(txn: dict, config: SyncConfig | None = None) -> str | None:
     """Check unmatched Amazon transactions against known charge patterns.
 
     Returns result message if auto-categorized, None if truly unmatched.
     """
     from src.tools import ynab
 
-    config = load_sync_config()
+    if config is None:
+        config = load_sync_config()
     payee = (txn.get("payee_name") or "").lower()
     memo = (txn.get("memo") or "").lower()
     combined = f"{payee} {memo}"
+    now = datetime.now().isoformat()
 
-    for pattern, category_name in config.known_charge_patterns.items():
+    # Single regex pass rejects the common no-pattern case; on a hit, the loop below
+    # keeps the configured pattern priority.
+    patterns = config.known_charge_patterns
+    if not patterns or not _charge_pattern_regex(tuple(patterns)).search(combined):
+        patterns = {}
+
+    for pattern, category_name in patterns.items():
         if pattern in combined:
-            # Find category ID
-            categories = ynab._get_categories()
-            cat_id = ""
-            for cid, cat in categories.items():
-                if cat["name"].lower() == category_name.lower():
-                    cat_id = cid
-                    break
+            # Find category ID (_get_categories is TTL-cached and keyed by lowercase name)
+            category = ynab._get_categories().get(category_name.lower())
+            cat_id = category["id"] if category else ""
 
             if cat_id:
                 ynab.split_transaction(
@@ -1543,8 +2159,8 @@ def handle_known_charge_patterns(txn: dict) -> str | None:
                     SyncRecord(
                         ynab_transaction_id=txn["id"],
                         status="auto_split",
-                        matched_at=datetime.now().isoformat(),
-                        split_applied_at=datetime.now().isoformat(),
+                        matched_at=now,
+                        split_applied_at=now,
                         ynab_amount=txn["amount"],
                         ynab_date=txn["date"],
                         original_memo=txn.get("memo") or "",
@@ -1559,7 +2175,7 @@ def handle_known_charge_patterns(txn: dict) -> str | None:
         SyncRecord(
             ynab_transaction_id=txn["id"],
             status="unmatched",
-            matched_at=datetime.now().isoformat(),
+            matched_at=now,
             ynab_amount=txn["amount"],
             ynab_date=txn["date"],
             original_memo=txn.get("memo") or "",
@@ -1588,16 +2204,17 @@ def get_amazon_spending_breakdown(month: str = "") -> str:
     else:
         target_month = date.today().strftime("%Y-%m")
 
-    # Aggregate by category
-    category_totals: dict[str, float] = {}
-    for record in records.values():
-        rec_date = record.get("ynab_date", "")
-        if not rec_date or rec_date[:7] != target_month:
-            continue
-        for item in record.get("items", []):
+    # Aggregate by category and collect items for "Top purchases" in the same pass
+    # (integer milliunits — converted to dollars once per category when formatting)
+    category_milli: dict[str, int] = {}
+    month_items: list[tuple[str, int]] = []
+    for txn_id in _records_index(records).by_month.get(target_month, ()):
+        for item in records[txn_id].get("items", []):
             cat = item.get("classified_category") or "Uncategorized"
-            amt = abs(item.get("allocated_amount", 0)) / 1000  # milliunits to dollars
-            category_totals[cat] = category_totals.get(cat, 0) + amt
+            amt = abs(item.get("allocated_amount", 0))
+            category_milli[cat] = category_milli.get(cat, 0) + amt
+            month_items.append((item.get("title", ""), amt))
+    category_totals = {cat: milli / 1000 for cat, milli in category_milli.items()}
 
     if not category_totals:
         return f"No Amazon spending data for {target_month}."
@@ -1631,18 +2248,12 @@ def get_amazon_spending_breakdown(month: str = "") -> str:
                 budget_note = f" — {status}"
         lines.append(f"  • ${amount:,.2f} {cat_name}{budget_note}")
 
-    # Top items insight
-    top_items = []
-    for record in records.values():
-        if record.get("ynab_date", "")[:7] != target_month:
-            continue
-        for item in record.get("items", []):
-            top_items.append((item.get("title", ""), abs(item.get("allocated_amount", 0)) / 1000))
-    top_items.sort(key=lambda x: x[1], reverse=True)
+    # Top items insight (nlargest is stable like sort(reverse=True), without sorting every item)
+    top_items = heapq.nlargest(5, month_items, key=lambda x: x[1])
     if top_items:
         lines.append("\nTop purchases:")
-        for title, amt in top_items[:5]:
-            lines.append(f"  • ${amt:,.2f} — {title[:50]}")
+        for title, amt in top_items:
+            lines.append(f"  • ${_dollars(amt):,.2f} — {title[:50]}")
 
     return "\n".join(lines)
 
@@ -1658,45 +2269,53 @@ def detect_recurring_purchases() -> list[dict]:
     Returns list of {title, category, avg_amount, interval_days, occurrences}.
     """
     records = load_sync_records()
+    mappings = load_category_mappings()
 
-    # Group items by normalized title
-    item_dates: dict[str, list[tuple[str, float]]] = {}
+    # One pass with constant state per normalized title: [first_date, last_date, count, milliunits_sum].
+    # Consecutive purchase intervals telescope, so their average is just
+    # (last - first) / (count - 1) — no per-title date list or sort needed.
+    stats: dict[str, list] = {}
     for record in records.values():
         rec_date = record.get("ynab_date", "")
+        if not rec_date:
+            continue  # undated records can't contribute an interval
         for item in record.get("items", []):
-            title = item.get("title", "").lower().strip()
-            amt = abs(item.get("allocated_amount", 0)) / 1000
-            if title:
-                item_dates.setdefault(title, []).append((rec_date, amt))
+            title = item.get("title_normalized") or item.get("title", "").lower().strip()
+            if not title:
+                continue
+            amt = abs(item.get("allocated_amount", 0))
+            entry = stats.get(title)
+            if entry is None:
+                stats[title] = [rec_date, rec_date, 1, amt]
+            else:
+                if rec_date < entry[0]:
+                    entry[0] = rec_date
+                elif rec_date > entry[1]:
+                    entry[1] = rec_date
+                entry[2] += 1
+                entry[3] += amt
 
     recurring = []
-    for title, entries in item_dates.items():
-        if len(entries) < 2:
+    for title, (first_date, last_date, count, milli_sum) in stats.items():
+        if count < 2:
             continue
 
-        # Sort by date
-        entries.sort()
-        dates = [date.fromisoformat(d) for d, _ in entries]
-        amounts = [a for _, a in entries]
-
         # Calculate average interval between purchases
-        intervals = [(dates[i + 1] - dates[i]).days for i in range(len(dates) - 1)]
-        avg_interval = sum(intervals) / len(intervals)
+        avg_interval = (date.fromisoformat(last_date) - date.fromisoformat(first_date)).days / (count - 1)
 
         # Monthly pattern: average interval between 25-35 days
         if 25 <= avg_interval <= 35:
             recurring.append(
                 {
-                    # Use original case if available
-                    "title": entries[0][0].split("|")[0] if "|" in entries[0][0] else title,
+                    "title": title,
                     "category": "",
-                    "avg_amount": sum(amounts) / len(amounts),
+                    "avg_amount": milli_sum / 1000 / count,
                     "interval_days": round(avg_interval),
-                    "occurrences": len(entries),
+                    "occurrences": count,
                 }
             )
             # Fill category from mappings
-            cached = lookup_cached_category(title)
+            cached = lookup_cached_category(title, mappings)
             if cached:
                 recurring[-1]["category"] = cached.get("category_name", "")
 
@@ -1716,11 +2335,12 @@ def check_large_purchases(enriched_transactions: list[dict]) -> list[str]:
     Returns list of tip strings to append to suggestion messages.
     """
     tips = []
+    threshold_milli = LARGE_PURCHASE_THRESHOLD * 1000
     for match in enriched_transactions:
-        items = match.get("classified_items", [])
-        for ci in items:
-            total_dollars = abs(ci.allocated_amount) / 1000
-            if total_dollars >= LARGE_PURCHASE_THRESHOLD:
+        for ci in match.get("classified_items", []):
+            # Integer compare in milliunits; only convert the rare hit to dollars
+            if abs(ci.allocated_amount) >= threshold_milli:
+                total_dollars = _dollars(ci.allocated_amount)
                 tips.append(
                     f"💰 Large purchase: {ci.title[:40]} (${total_dollars:,.2f}) — "
                     f"this might come from a sinking fund. Currently categorized as "
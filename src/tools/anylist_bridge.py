@@ -1,8 +1,10 @@
 """AnyList sidecar bridge — push grocery lists via the Node.js REST API."""
 
+import atexit
 import logging
 
 import httpx
+import orjson
 
 from src.config import ANYLIST_SIDECAR_URL, FAMILY_CONFIG
 
@@ -14,6 +16,16 @@ TIMEOUT = 15.0
 MAX_ANYLIST_PUSH = 200  # refuse to push more items than this
 MAX_ANYLIST_CLEAR = 150  # warn if clearing more than this many items
 
+# One keep-alive client for the sidecar, so back-to-back calls (clear + add-bulk)
+# reuse the connection. Transport retries only cover failed connection attempts.
+_CLIENT = httpx.Client(
+    base_url=ANYLIST_SIDECAR_URL.rstrip("/"),
+    timeout=TIMEOUT,
+    limits=httpx.Limits(max_keepalive_connections=10),
+    transport=httpx.HTTPTransport(retries=2),
+)
+atexit.register(_CLIENT.close)
+
 
 def push_grocery_list(items: list[str], list_name: str = "Grocery") -> str:
     """Clear the list and push new grocery items to AnyList.
@@ -39,12 +51,15 @@ def push_grocery_list(items: list[str], list_name: str = "Grocery") -> str:
             f"(max {MAX_ANYLIST_PUSH}). Check the grocery list generation."
         )
 
-    base = ANYLIST_SIDECAR_URL.rstrip("/")
+    # Clear and add in one round trip; sidecars without /replace get clear + add-bulk
+    resp = _CLIENT.post("/replace", json={"items": items, "list": list_name})
+    if resp.status_code == 404:
+        cleared, added = _clear_then_add(items, list_name)
+    else:
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        cleared, added = data.get("cleared", 0), data.get("added", 0)
 
-    # Clear old items first
-    resp = httpx.post(f"{base}/clear", json={"list": list_name}, timeout=TIMEOUT)
-    resp.raise_for_status()
-    cleared = resp.json().get("count", 0)
     if cleared > MAX_ANYLIST_CLEAR:
         logger.warning(
             "SAFEGUARD WARNING: Cleared %d items from AnyList (threshold %d). This is unusually high.",
@@ -52,27 +67,27 @@ def push_grocery_list(items: list[str], list_name: str = "Grocery") -> str:
             MAX_ANYLIST_CLEAR,
         )
     logger.info("Cleared %d old items from AnyList", cleared)
-
-    # Add new items in bulk
-    resp = httpx.post(
-        f"{base}/add-bulk",
-        json={"items": items, "list": list_name},
-        timeout=TIMEOUT,
-    )
-    resp.raise_for_status()
-    added = resp.json().get("count", 0)
     logger.info("Added %d items to AnyList", added)
 
     store = FAMILY_CONFIG.get("grocery_store", "grocery store")
     return f"Pushed {added} items to AnyList. Open the app → 'Order Pickup or Delivery' → {store}."
 
 
+def _clear_then_add(items: list[str], list_name: str) -> tuple[int, int]:
+    """Two-call replace for older sidecars. Returns (cleared, added)."""
+    resp = _CLIENT.post("/clear", json={"list": list_name})
+    resp.raise_for_status()
+    cleared = orjson.loads(resp.content).get("count", 0)
+    resp = _CLIENT.post("/add-bulk", json={"items": items, "list": list_name})
+    resp.raise_for_status()
+    return cleared, orjson.loads(resp.content).get("count", 0)
+
+
 def clear_grocery_list(list_name: str = "Grocery") -> str:
     """Clear all items from an AnyList list."""
-    base = ANYLIST_SIDECAR_URL.rstrip("/")
-    resp = httpx.post(f"{base}/clear", json={"list": list_name}, timeout=TIMEOUT)
+    resp = _CLIENT.post("/clear", json={"list": list_name})
     resp.raise_for_status()
-    count = resp.json().get("count", 0)
+    count = orjson.loads(resp.content).get("count", 0)
     if count > MAX_ANYLIST_CLEAR:
         logger.warning(
             "SAFEGUARD WARNING: Cleared %d items from AnyList '%s' (threshold %d).",
@@ -85,11 +100,9 @@ def clear_grocery_list(list_name: str = "Grocery") -> str:
 
 def get_grocery_items(list_name: str = "Grocery") -> str:
     """Get current items from an AnyList list."""
-    base = ANYLIST_SIDECAR_URL.rstrip("/")
-    resp = httpx.get(f"{base}/items", params={"list": list_name}, timeout=TIMEOUT)
+    resp = _CLIENT.get("/items", params={"list": list_name})
     resp.raise_for_status()
-    items = resp.json().get("items", [])
+    items = orjson.loads(resp.content).get("items", [])
     if not items:
         return "No items on the list."
-    lines = [f"- {'✅' if i.get('checked') else '⬜'} {i['name']}" for i in items]
-    return "\n".join(lines)
+    return "\n".join(f"- {'✅' if i.get('checked') else '⬜'} {i['name']}" for i in items)
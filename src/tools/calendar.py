@@ -1,35 +1,25 @@
 """Google Calendar API wrapper — read from multiple calendars + write events."""
 
-import json
+import heapq
 import logging
-import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta, timezone
-from pathlib import Path
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 
+from src.auth import get_google_credentials
 from src.config import (
     CALENDAR_IDS,
     DEFAULT_CALENDAR,
-    GOOGLE_CREDENTIALS_JSON,
-    GOOGLE_TOKEN_JSON,
     TIMEZONE,
     TIMEZONE_STR,
 )
 
 logger = logging.getLogger(__name__)
 
-SCOPES = [
-    "https://www.googleapis.com/auth/calendar",
-    "https://www.googleapis.com/auth/gmail.readonly",
-]
-TOKEN_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "token.json")
-CREDENTIALS_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "credentials.json")
-
 # Color coding for assistant-created events (Google Calendar colorId values)
 COLOR_CHORES = "6"  # Tangerine
 COLOR_REST = "2"  # Sage
@@ -108,80 +98,187 @@ MAX_CALENDAR_DELETES = 50  # refuse to delete more than this in a single call
 MAX_CALENDAR_CREATES = 50  # refuse to create more than this in a single call
 
 
-_VOLUME_TOKEN_PATH = Path("/app/data/token.json")
+_service_local = threading.local()
 
 
 def _get_service():
-    """Build and return an authenticated Google Calendar service.
+    """Return an authenticated Google Calendar service, built once per thread.
 
-    Credential loading priority:
-    1. GOOGLE_TOKEN_JSON env var (Railway / containerized deployments)
-    2. Volume-backed token file at /app/data/token.json (persists refreshed tokens)
-    3. Local token.json file (development)
-    4. Interactive OAuth flow via credentials.json (initial local setup only)
+    The service wraps an httplib2 connection, which is not thread-safe, so each
+    thread keeps its own. Credentials come from the process-wide cache in src.auth
+    and are refreshed in place, so a cached service survives token refreshes.
     """
-    creds = None
+    service = getattr(_service_local, "service", None)
+    if service is None:
+        # Bundled discovery doc: no discovery fetch, no discovery-cache writes
+        service = build(
+            "calendar",
+            "v3",
+            credentials=get_google_credentials(),
+            static_discovery=True,
+            cache_discovery=False,
+        )
+        _service_local.service = service
+    return service
 
-    # 1. Try env var first (Railway deployment)
-    if GOOGLE_TOKEN_JSON:
-        try:
-            token_data = json.loads(GOOGLE_TOKEN_JSON)
-            creds = Credentials.from_authorized_user_info(token_data, SCOPES)
-            logger.info("Google credentials loaded from GOOGLE_TOKEN_JSON env var")
-        except Exception as e:
-            logger.error("Failed to load GOOGLE_TOKEN_JSON: %s", e)
 
-    # 2. Try volume-backed token file (persists across redeploys)
-    if not creds and _VOLUME_TOKEN_PATH.exists():
-        try:
-            creds = Credentials.from_authorized_user_file(str(_VOLUME_TOKEN_PATH), SCOPES)
-            logger.info("Google credentials loaded from volume token file")
-        except Exception as e:
-            logger.warning("Failed to load volume token file: %s", e)
+def _execute_batch(service, requests: dict[str, object], action: str) -> set[str]:
+    """Send several Calendar API requests in one batch HTTP round trip.
 
-    # 3. Try local token file (development)
-    if not creds and os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+    ``requests`` maps a request ID to an unexecuted API request; returns the IDs
+    that succeeded. Our MAX_CALENDAR_* limits keep this well under the
+    1000-request batch cap, so one batch always suffices.
+    """
+    succeeded: set[str] = set()
+    if not requests:
+        return succeeded
 
-    # Refresh if expired (with retry for transient network failures)
-    if creds and not creds.valid:
-        if creds.expired and creds.refresh_token:
-            for attempt in range(3):
-                try:
-                    creds.refresh(Request())
-                    logger.info("Google credentials refreshed successfully")
-                    break
-                except Exception as e:
-                    if attempt < 2:
-                        logger.warning("Token refresh attempt %d failed: %s", attempt + 1, e)
-                        time.sleep(2**attempt)
-                    else:
-                        logger.error("Token refresh failed after 3 attempts: %s", e)
-                        raise
+    def _on_response(request_id, response, exception):
+        if exception is None:
+            succeeded.add(request_id)
         else:
-            creds = None  # Can't refresh, need new auth
+            logger.warning("Failed to %s event %s: %s", action, request_id, exception)
+
+    batch = service.new_batch_http_request(callback=_on_response)
+    for request_id, request in requests.items():
+        batch.add(request, request_id=request_id)
+    try:
+        batch.execute()
+    except Exception as e:
+        logger.warning("Calendar batch %s request failed: %s", action, e)
+    return succeeded
+
+
+# --- Read cache ---
+# Daily plans, nudges and context building re-read the same windows several times
+# a minute. Identical reads within READ_CACHE_TTL are served from memory; every
+# write through this module clears the cache so new events show up immediately.
+READ_CACHE_TTL = 60  # seconds
+_READ_CACHE_MAX = 64
+_read_cache: OrderedDict[tuple, tuple[float, object]] = OrderedDict()  # key → (stored_at, value), LRU order
+_read_cache_lock = threading.Lock()
+
+
+def _read_cache_get(key: tuple):
+    with _read_cache_lock:
+        hit = _read_cache.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] >= READ_CACHE_TTL:
+            del _read_cache[key]
+            return None
+        _read_cache.move_to_end(key)
+        return hit[1]
+
+
+def _read_cache_put(key: tuple, value) -> None:
+    with _read_cache_lock:
+        _read_cache[key] = (time.monotonic(), value)
+        _read_cache.move_to_end(key)
+        while len(_read_cache) > _READ_CACHE_MAX:
+            _read_cache.popitem(last=False)
+
+
+def _invalidate_read_cache() -> None:
+    with _read_cache_lock:
+        _read_cache.clear()
+
+
+# Partial-response masks for events().list — each read asks only for the fields
+# its callers use (full event resources carry attendees, reminders, etc.).
+_FIELDS_SUMMARY = "nextPageToken,items(id,summary,start)"
+_FIELDS_DAY = "nextPageToken,items(id,summary,description,location,start,end)"
+_FIELDS_NUDGE = (
+    "nextPageToken,items(id,summary,description,location,start,end,creator,"
+    "conferenceData,extendedProperties,hangoutLink,attendees)"
+)
 
-    # 4. Interactive OAuth flow (local development only)
-    if not creds:
-        cred_path = CREDENTIALS_PATH
-        if GOOGLE_CREDENTIALS_JSON:
-            # Write credentials from env var to temp file for the flow
-            import tempfile
 
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".json", delete=False) as f:
-                f.write(GOOGLE_CREDENTIALS_JSON)
-                cred_path = f.name
-        flow = InstalledAppFlow.from_client_secrets_file(cred_path, SCOPES)
-        creds = flow.run_local_server(port=0)
+# Long-lived pool for per-calendar reads: its threads keep their cached services
+# between calls instead of rebuilding one per request.
+_READ_POOL = ThreadPoolExecutor(max_workers=max(1, len(CALENDAR_IDS)), thread_name_prefix="calendar-read")
+# Fallback for deletes the batch endpoint did not confirm (deletes are idempotent,
+# so retrying them one by one is safe).
+_DELETE_POOL = ThreadPoolExecutor(max_workers=10, thread_name_prefix="calendar-delete")
 
-    # Persist refreshed/new token to volume (survives redeploys) and local file
-    token_json = creds.to_json()
-    if _VOLUME_TOKEN_PATH.parent.exists():
-        _VOLUME_TOKEN_PATH.write_text(token_json)
-    with open(TOKEN_PATH, "w") as f:
-        f.write(token_json)
 
-    return build("calendar", "v3", credentials=creds)
+def _delete_one(cal_id: str, event_id: str) -> bool:
+    """Delete a single event with this worker thread's own service."""
+    try:
+        _get_service().events().delete(calendarId=cal_id, eventId=event_id).execute()
+        return True
+    except Exception as e:
+        logger.warning("Failed to delete event %s: %s", event_id, e)
+        return False
+
+
+def _event_start_key(event: dict) -> str:
+    return event["start"].get("dateTime", event["start"].get("date", ""))
+
+
+def _list_calendars(
+    calendar_names: list[str], time_min: str, time_max: str, fields: str, cache: bool = True
+) -> list[dict]:
+    """List events in [time_min, time_max) from several calendars concurrently.
+
+    One events().list request per calendar, run in parallel so the total wait is
+    the slowest calendar rather than the sum. Returns events tagged with
+    ``_calendar_source``, sorted by start time. A calendar that fails to load is
+    logged and skipped. Complete results are served from the read cache for
+    READ_CACHE_TTL; pass ``cache=False`` for windows that are never asked for
+    twice (e.g. ones starting at "now"). Each caller gets its own event dicts,
+    so adding or replacing top-level keys never leaks into the cache; nested
+    values (``start``, ``attendees``, ...) are shared and must not be mutated.
+    """
+    key = ("list", tuple(calendar_names), time_min, time_max, fields)
+    cached = _read_cache_get(key) if cache else None
+    if cached is not None:
+        return [dict(event) for event in cached]
+
+    # Resolve calendar IDs up front; unknown names never reach the API
+    resolved = [(name, CALENDAR_IDS[name]) for name in calendar_names if name in CALENDAR_IDS]
+    if not resolved:
+        return []
+
+    def _list_one(name: str, cal_id: str) -> list[dict] | None:
+        service = _get_service()  # this worker thread's own service
+        events: list[dict] = []
+        page_token = None
+        try:
+            while True:
+                result = (
+                    service.events()
+                    .list(
+                        calendarId=cal_id,
+                        timeMin=time_min,
+                        timeMax=time_max,
+                        singleEvents=True,
+                        orderBy="startTime",
+                        maxResults=250,
+                        fields=fields,
+                        pageToken=page_token,
+                    )
+                    .execute()
+                )
+                events.extend(result.get("items", []))
+                page_token = result.get("nextPageToken")
+                if not page_token:
+                    break
+        except Exception as e:
+            logger.warning("Failed to read %s calendar: %s", name, e)
+            return None
+        for event in events:
+            event["_calendar_source"] = name
+        # Already in orderBy=startTime order, so this is a linear pass that just
+        # guarantees the string key order heapq.merge relies on.
+        events.sort(key=_event_start_key)
+        return events
+
+    batches = list(_READ_POOL.map(_list_one, *zip(*resolved)))
+    events = list(heapq.merge(*(batch for batch in batches if batch), key=_event_start_key))
+    if cache and None not in batches:  # don't pin a partial result after a failed read
+        _read_cache_put(key, [dict(event) for event in events])
+    return events
 
 
 # ---------------------------------------------------------------------------
@@ -189,6 +286,9 @@ def _get_service():
 # ---------------------------------------------------------------------------
 
 
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
 def get_calendar_events(
     days_ahead: int = 7,
     calendar_names: list[str] | None = None,
@@ -205,41 +305,23 @@ def get_calendar_events(
     if calendar_names is None:
         calendar_names = list(CALENDAR_IDS.keys())
 
+    # "Next N days" starts at now, so cache the formatted text by arguments
+    key = ("upcoming", days_ahead, tuple(calendar_names))
+    cached = _read_cache_get(key)
+    if cached is not None:
+        return cached
+
     try:
-        service = _get_service()
         now = datetime.now(tz=timezone.utc)
         time_min = now.isoformat()
         time_max = (now + timedelta(days=days_ahead)).isoformat()
 
-        all_events = []
-        for name in calendar_names:
-            cal_id = CALENDAR_IDS.get(name)
-            if not cal_id:
-                continue
-            try:
-                result = (
-                    service.events()
-                    .list(
-                        calendarId=cal_id,
-                        timeMin=time_min,
-                        timeMax=time_max,
-                        singleEvents=True,
-                        orderBy="startTime",
-                    )
-                    .execute()
-                )
-                for event in result.get("items", []):
-                    event["_calendar_source"] = name
-                    all_events.append(event)
-            except Exception as e:
-                logger.warning("Failed to read %s calendar: %s", name, e)
-
+        # Sorted by start time across all calendars
+        # time_min is "now", so the raw list is never re-read; the text entry above covers repeats
+        all_events = _list_calendars(calendar_names, time_min, time_max, _FIELDS_SUMMARY, cache=False)
         if not all_events:
             return "No events scheduled for the upcoming week."
 
-        # Sort all events by start time
-        all_events.sort(key=lambda e: e["start"].get("dateTime", e["start"].get("date", "")))
-
         lines = []
         for event in all_events:
             start = event["start"].get("dateTime", event["start"].get("date", ""))
@@ -249,14 +331,15 @@ def get_calendar_events(
 
             if "T" in start:
                 dt = datetime.fromisoformat(start)
-                day = dt.strftime("%A")
-                time_str = dt.strftime("%-I:%M %p")
+                day = _DAY_NAMES[dt.weekday()]
+                time_str = f"{(dt.hour - 1) % 12 + 1}:{dt.minute:02d} {'AM' if dt.hour < 12 else 'PM'}"
                 lines.append(f"- {day}: {summary} at {time_str}{label}")
             else:
-                dt = datetime.strptime(start, "%Y-%m-%d")
-                day = dt.strftime("%A")
+                day = _DAY_NAMES[date.fromisoformat(start[:10]).weekday()]
                 lines.append(f"- {day}: {summary} (all day){label}")
-        return "\n".join(lines)
+        text = "\n".join(lines)
+        _read_cache_put(key, text)
+        return text
     except Exception as e:
         logger.error("Google Calendar API error: %s", e)
         return f"Error reading Google Calendar: {e}"
@@ -273,35 +356,10 @@ def get_events_for_date(
     if calendar_names is None:
         calendar_names = list(CALENDAR_IDS.keys())
 
-    service = _get_service()
     start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
     end_of_day = start_of_day + timedelta(days=1)
 
-    events = []
-    for name in calendar_names:
-        cal_id = CALENDAR_IDS.get(name)
-        if not cal_id:
-            continue
-        try:
-            result = (
-                service.events()
-                .list(
-                    calendarId=cal_id,
-                    timeMin=start_of_day.isoformat(),
-                    timeMax=end_of_day.isoformat(),
-                    singleEvents=True,
-                    orderBy="startTime",
-                )
-                .execute()
-            )
-            for event in result.get("items", []):
-                event["_calendar_source"] = name
-                events.append(event)
-        except Exception as e:
-            logger.warning("Failed to read %s calendar for date: %s", name, e)
-
-    events.sort(key=lambda e: e["start"].get("dateTime", e["start"].get("date", "")))
-    return events
+    return _list_calendars(calendar_names, start_of_day.isoformat(), end_of_day.isoformat(), _FIELDS_DAY)
 
 
 # ---------------------------------------------------------------------------
@@ -313,45 +371,20 @@ def get_events_for_date_raw(
     target_date: date,
     calendar_names: list[str] | None = None,
 ) -> list[dict]:
-    """Fetch full event dicts for a specific date, including conferenceData.
+    """Fetch event dicts for a specific date, including conferenceData.
 
-    Returns raw Google Calendar event dicts with all fields (conferenceData,
+    Returns raw Google Calendar event dicts with the fields (conferenceData,
     description, creator, extendedProperties, etc.) needed for nudge processing.
     Defaults to Partner 2's and family calendars.
     """
     if calendar_names is None:
         calendar_names = [DEFAULT_CALENDAR, "family"]
 
-    service = _get_service()
     pacific = TIMEZONE
     start_of_day = datetime(target_date.year, target_date.month, target_date.day, tzinfo=pacific)
     end_of_day = start_of_day + timedelta(days=1)
 
-    events = []
-    for name in calendar_names:
-        cal_id = CALENDAR_IDS.get(name)
-        if not cal_id:
-            continue
-        try:
-            result = (
-                service.events()
-                .list(
-                    calendarId=cal_id,
-                    timeMin=start_of_day.isoformat(),
-                    timeMax=end_of_day.isoformat(),
-                    singleEvents=True,
-                    orderBy="startTime",
-                )
-                .execute()
-            )
-            for event in result.get("items", []):
-                event["_calendar_source"] = name
-                events.append(event)
-        except Exception as e:
-            logger.warning("Failed to read %s calendar for date: %s", name, e)
-
-    events.sort(key=lambda e: e["start"].get("dateTime", e["start"].get("date", "")))
-    return events
+    return _list_calendars(calendar_names, start_of_day.isoformat(), end_of_day.isoformat(), _FIELDS_NUDGE)
 
 
 # ---------------------------------------------------------------------------
@@ -388,6 +421,7 @@ def create_event(
         "extendedProperties": {"private": {"createdBy": CREATED_BY_TAG}},
     }
     event = service.events().insert(calendarId=cal_id, body=event_body).execute()
+    _invalidate_read_cache()
     return f"Created event: {summary} ({event.get('id', '')})"
 
 
@@ -464,6 +498,7 @@ def create_quick_event(
         event_body["recurrence"] = recurrence
 
     event = service.events().insert(calendarId=cal_id, body=event_body).execute()
+    _invalidate_read_cache()
     kind = "recurring event" if recurrence else "reminder"
     result = f"Created {kind} on {calendar_name} calendar: {summary} ({event.get('id', '')})"
 
@@ -513,9 +548,9 @@ def batch_create_events(events_data: list[dict], calendar_name: str = DEFAULT_CA
         )
 
     service = _get_service()
-    created = 0
+    inserts: dict[str, object] = {}
     all_corrections: list[str] = []
-    for evt in events_data:
+    for i, evt in enumerate(events_data):
         # Validate and correct likely AM/PM errors before API submission
         corrected_start, corrected_end, corrections = _validate_event_time(
             evt["start_time"], evt["end_time"], evt["summary"]
@@ -525,18 +560,20 @@ def batch_create_events(events_data: list[dict], calendar_name: str = DEFAULT_CA
                 logger.warning("Time correction: %s", c)
             all_corrections.extend(corrections)
 
-        try:
-            event_body = {
-                "summary": evt["summary"],
-                "start": {"dateTime": corrected_start, "timeZone": TIMEZONE_STR},
-                "end": {"dateTime": corrected_end, "timeZone": TIMEZONE_STR},
-                "colorId": evt.get("color_id", COLOR_CHORES),
-                "extendedProperties": {"private": {"createdBy": CREATED_BY_TAG}},
-            }
-            service.events().insert(calendarId=cal_id, body=event_body).execute()
-            created += 1
-        except Exception as e:
-            logger.warning("Failed to create event '%s': %s", evt.get("summary"), e)
+        event_body = {
+            "summary": evt["summary"],
+            "start": {"dateTime": corrected_start, "timeZone": TIMEZONE_STR},
+            "end": {"dateTime": corrected_end, "timeZone": TIMEZONE_STR},
+            "colorId": evt.get("color_id", COLOR_CHORES),
+            "extendedProperties": {"private": {"createdBy": CREATED_BY_TAG}},
+        }
+        # Request IDs must be unique; prefix with the index so failures name the event
+        inserts[f"{i}:{evt['summary']}"] = service.events().insert(calendarId=cal_id, body=event_body)
+
+    # All inserts in one HTTP round trip. Failed inserts are not retried
+    # individually — a lost response could otherwise create duplicates.
+    created = len(_execute_batch(service, inserts, "create"))
+    _invalidate_read_cache()
     logger.info("Created %d events on '%s'", created, calendar_name)
     return created, all_corrections
 
@@ -554,42 +591,59 @@ def delete_assistant_events(
     if not cal_id:
         return 0
 
-    service = _get_service()
     result = (
-        service.events()
+        _get_service()
+        .events()
         .list(
             calendarId=cal_id,
             timeMin=start_date,
             timeMax=end_date,
             singleEvents=True,
             privateExtendedProperty=f"createdBy={CREATED_BY_TAG}",
+            fields="items(id)",
         )
         .execute()
     )
 
-    events = result.get("items", [])
-    if len(events) > MAX_CALENDAR_DELETES:
+    event_ids = [event["id"] for event in result.get("items", [])]
+    deleted = delete_events_by_id(event_ids, calendar_name=calendar_name)
+    logger.info("Deleted %d assistant events from '%s' (%s to %s)", deleted, calendar_name, start_date, end_date)
+    return deleted
+
+
+def delete_events_by_id(event_ids: list[str], calendar_name: str = DEFAULT_CALENDAR) -> int:
+    """Delete the given events from a calendar. Returns count deleted.
+
+    For callers that already hold the event IDs, so no extra list request is
+    needed. Subject to the same MAX_CALENDAR_DELETES safeguard.
+    """
+    cal_id = CALENDAR_IDS.get(calendar_name)
+    if not cal_id or not event_ids:
+        return 0
+
+    if len(event_ids) > MAX_CALENDAR_DELETES:
         logger.error(
-            "SAFEGUARD: Refusing to delete %d calendar events (max %d). Date range %s to %s on calendar '%s'.",
-            len(events),
+            "SAFEGUARD: Refusing to delete %d calendar events (max %d) on calendar '%s'.",
+            len(event_ids),
             MAX_CALENDAR_DELETES,
-            start_date,
-            end_date,
             calendar_name,
         )
         raise ValueError(
-            f"Safety limit: refusing to delete {len(events)} events "
+            f"Safety limit: refusing to delete {len(event_ids)} events "
             f"(max {MAX_CALENDAR_DELETES}). Narrow the date range or increase the limit."
         )
 
-    deleted = 0
-    for event in events:
-        try:
-            service.events().delete(calendarId=cal_id, eventId=event["id"]).execute()
-            deleted += 1
-        except Exception as e:
-            logger.warning("Failed to delete event %s: %s", event["id"], e)
-    logger.info("Deleted %d assistant events from '%s' (%s to %s)", deleted, calendar_name, start_date, end_date)
+    service = _get_service()
+    deletes = {event_id: service.events().delete(calendarId=cal_id, eventId=event_id) for event_id in event_ids}
+    succeeded = _execute_batch(service, deletes, "delete")
+    remaining = [event_id for event_id in deletes if event_id not in succeeded]
+    if remaining:
+        logger.info("Retrying %d calendar deletes individually", len(remaining))
+        retried = _DELETE_POOL.map(lambda event_id: _delete_one(cal_id, event_id), remaining)
+        deleted = len(succeeded) + sum(retried)
+    else:
+        deleted = len(succeeded)
+    _invalidate_read_cache()
     return deleted
 
 
@@ -623,6 +677,7 @@ def delete_calendar_event(
         # Delete the entire event (and all its occurrences)
         try:
             service.events().delete(calendarId=cal_id, eventId=event_id).execute()
+            _invalidate_read_cache()
             return f"Deleted all occurrences of '{summary}' from {calendar_name} calendar."
         except Exception as e:
             return f"Failed to delete event: {e}"
@@ -630,6 +685,7 @@ def delete_calendar_event(
         # Cancel just this single occurrence — set status to cancelled
         try:
             service.events().delete(calendarId=cal_id, eventId=event_id).execute()
+            _invalidate_read_cache()
             return f"Cancelled this occurrence of '{summary}' from {calendar_name} calendar."
         except Exception as e:
             return f"Failed to cancel occurrence: {e}"
@@ -769,6 +825,7 @@ def fix_corrupted_event(event_id: str, calendar_id: str) -> bool:
             event["end"]["dateTime"] = end_dt.replace(hour=end_dt.hour + 12).isoformat()
 
         service.events().update(calendarId=calendar_id, eventId=event_id, body=event).execute()
+        _invalidate_read_cache()
         logger.info(
             "Fixed corrupted event: '%s' — shifted +12h (id=%s)",
             event.get("summary", ""),
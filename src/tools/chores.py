@@ -1,9 +1,12 @@
 """Chore suggestions, free window detection, and preference tracking."""
 
-import json
+import heapq
 import logging
+import time
 from datetime import date, datetime, timedelta
 
+import orjson
+
 from src.config import DEFAULT_CALENDAR, TIMEZONE
 from src.tools.calendar import get_events_for_date_raw
 from src.tools.notion import (
@@ -32,6 +35,45 @@ _skipped_today: set[str] = set()
 _skipped_date: date | None = None
 
 
+# Chores DB rarely changes; cache it briefly so suggest/complete/skip in one
+# conversation share a single Notion query. Writes below invalidate it.
+CHORES_CACHE_TTL = 60  # seconds
+_chores_cache: list[dict] | None = None
+_chores_cache_time: float = 0.0
+# Lowercased names and preferred-day bitmasks (bit 0 = Monday) for the cached
+# chores, rebuilt with each refresh
+_chores_by_lower_name: dict[str, dict] = {}
+_chores_lower_names: list[tuple[str, dict]] = []
+_chore_day_masks: dict[str, int] = {}
+
+_WEEKDAY_INDEX = {
+    name: i for i, name in enumerate(("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"))
+}
+
+
+def _get_chores_cached() -> list[dict]:
+    """Return all chores, re-querying Notion at most once per CHORES_CACHE_TTL."""
+    global _chores_cache, _chores_cache_time, _chores_by_lower_name, _chores_lower_names, _chore_day_masks
+    if _chores_cache is not None and (time.monotonic() - _chores_cache_time) < CHORES_CACHE_TTL:
+        return _chores_cache
+    _chores_cache = query_all_chores()
+    _chores_cache_time = time.monotonic()
+    _chores_lower_names = [(chore["name"].lower(), chore) for chore in _chores_cache]
+    _chores_by_lower_name = {}
+    for lower_name, chore in _chores_lower_names:
+        _chores_by_lower_name.setdefault(lower_name, chore)  # first wins, as in the old scan
+    _chore_day_masks = {
+        chore["id"]: sum(1 << _WEEKDAY_INDEX[d] for d in set(chore.get("preferred_days") or ()) if d in _WEEKDAY_INDEX)
+        for chore in _chores_cache
+    }
+    return _chores_cache
+
+
+def _invalidate_chores_cache() -> None:
+    global _chores_cache
+    _chores_cache = None
+
+
 def _reset_skipped_if_new_day() -> None:
     """Reset the skipped chores set if it's a new day."""
     global _skipped_today, _skipped_date
@@ -72,8 +114,8 @@ def detect_free_windows(target_date: date) -> list[dict]:
         tzinfo=PACIFIC,
     )
 
-    # Collect all busy periods
-    busy_periods: list[tuple[datetime, datetime]] = []
+    # Collect busy periods as integer minutes from day_start
+    busy_periods: list[tuple[int, int]] = []
     for event in events:
         start_str = event["start"].get("dateTime")
         end_str = event.get("end", {}).get("dateTime")
@@ -92,45 +134,43 @@ def detect_free_windows(target_date: date) -> list[dict]:
         else:
             event_end = event_start + timedelta(hours=1)
 
-        busy_periods.append((event_start, event_end))
+        busy_periods.append(
+            (
+                int((event_start - day_start).total_seconds() // 60),
+                int((event_end - day_start).total_seconds() // 60),
+            )
+        )
 
     # Sort by start time
-    busy_periods.sort(key=lambda p: p[0])
+    busy_periods.sort()
 
     # Find gaps between busy periods
-    windows: list[dict] = []
-    current_time = day_start
+    day_minutes = int((day_end - day_start).total_seconds() // 60)
+    gaps: list[tuple[int, int]] = []
+    current = 0
 
     for busy_start, busy_end in busy_periods:
         # Clamp to day boundaries
-        busy_start = max(busy_start, day_start)
-        busy_end = min(busy_end, day_end)
-
-        if busy_start > current_time:
-            gap_minutes = int((busy_start - current_time).total_seconds() / 60)
-            if gap_minutes >= 15:
-                windows.append(
-                    {
-                        "start": current_time,
-                        "end": busy_start,
-                        "duration_minutes": gap_minutes,
-                    }
-                )
-
-        current_time = max(current_time, busy_end)
+        busy_start = min(max(busy_start, 0), day_minutes)
+        busy_end = min(busy_end, day_minutes)
 
-    # Check gap between last event and end of day
-    if current_time < day_end:
-        gap_minutes = int((day_end - current_time).total_seconds() / 60)
-        if gap_minutes >= 15:
-            windows.append(
-                {
-                    "start": current_time,
-                    "end": day_end,
-                    "duration_minutes": gap_minutes,
-                }
-            )
+        if busy_start - current >= 15:
+            gaps.append((current, busy_start))
 
+        current = max(current, busy_end)
+
+    # Check gap between last event and end of day
+    if day_minutes - current >= 15:
+        gaps.append((current, day_minutes))
+
+    windows = [
+        {
+            "start": day_start + timedelta(minutes=gap_start),
+            "end": day_start + timedelta(minutes=gap_end),
+            "duration_minutes": gap_end - gap_start,
+        }
+        for gap_start, gap_end in gaps
+    ]
     return windows
 
 
@@ -150,12 +190,12 @@ def suggest_chore(free_window_minutes: int) -> list[dict]:
     5. Return top 1-2 suggestions
     """
     _reset_skipped_if_new_day()
-    chores = query_all_chores()
+    chores = _get_chores_cached()
     if not chores:
         return []
 
     today = date.today()
-    day_name = today.strftime("%A")  # e.g., "Monday"
+    today_bit = 1 << today.weekday()
     scored: list[tuple[float, dict]] = []
 
     for chore in chores:
@@ -185,8 +225,7 @@ def suggest_chore(free_window_minutes: int) -> list[dict]:
         overdue_score = days_since / freq_days
 
         # Boost if today matches a preferred day
-        preferred_days = chore.get("preferred_days", [])
-        if preferred_days and day_name in preferred_days:
+        if _chore_day_masks.get(chore["id"], 0) & today_bit:
             overdue_score *= 1.5
 
         # Handle preference
@@ -200,12 +239,9 @@ def suggest_chore(free_window_minutes: int) -> list[dict]:
 
         scored.append((overdue_score, chore))
 
-    # Sort by score descending (most overdue first)
-    scored.sort(key=lambda x: x[0], reverse=True)
-
-    # Return top 1-2
+    # Top 1-2 by score (most overdue first) without sorting the rest
     suggestions = []
-    for score, chore in scored[:2]:
+    for score, chore in heapq.nlargest(2, scored, key=lambda x: x[0]):
         suggestions.append(
             {
                 "id": chore["id"],
@@ -226,26 +262,16 @@ def suggest_chore(free_window_minutes: int) -> list[dict]:
 
 def complete_chore(chore_name: str) -> str:
     """Mark a chore as completed. Updates Chores DB and associated nudge."""
-    chores = query_all_chores()
-    match = _fuzzy_match_chore(chore_name, chores)
+    match = _fuzzy_match_chore(chore_name)
     if not match:
         return f"Couldn't find a chore matching '{chore_name}'. Check the name and try again."
 
     today_str = date.today().isoformat()
     update_chore_completion(match["id"], today_str)
+    _invalidate_chores_cache()
 
     # Mark associated chore nudge as Done
-    chore_nudges = query_nudges_by_type("chore", statuses=["Sent", "Pending"])
-    for nudge in chore_nudges:
-        ctx = nudge.get("context", "")
-        if ctx:
-            try:
-                ctx_data = json.loads(ctx)
-                if ctx_data.get("chore_id") == match["id"]:
-                    update_nudge_status(nudge["id"], "Done")
-                    break
-            except (json.JSONDecodeError, TypeError):
-                pass
+    _close_chore_nudge(match["id"], "Done")
 
     logger.info("Chore completed: %s", match["name"])
     return f"Nice work! '{match['name']}' marked as done."
@@ -254,42 +280,51 @@ def complete_chore(chore_name: str) -> str:
 def skip_chore(chore_name: str) -> str:
     """Skip a suggested chore. Won't be re-suggested today."""
     _reset_skipped_if_new_day()
-    chores = query_all_chores()
-    match = _fuzzy_match_chore(chore_name, chores)
+    match = _fuzzy_match_chore(chore_name)
     if not match:
         return f"Couldn't find a chore matching '{chore_name}'."
 
     _skipped_today.add(match["name"])
 
     # Mark associated chore nudge as Dismissed
-    chore_nudges = query_nudges_by_type("chore", statuses=["Sent", "Pending"])
+    _close_chore_nudge(match["id"], "Dismissed")
+
+    logger.info("Chore skipped: %s", match["name"])
+    return f"No problem — skipping '{match['name']}' for today."
+
+
+def _close_chore_nudge(chore_id: str, new_status: str) -> None:
+    """Set the status of the open nudge for this chore, if there is one.
+
+    Notion narrows the query to nudges whose Context mentions the chore ID, so
+    only those few are decoded to confirm the match.
+    """
+    chore_nudges = query_nudges_by_type("chore", statuses=["Sent", "Pending"], context_contains=chore_id)
     for nudge in chore_nudges:
         ctx = nudge.get("context", "")
         if ctx:
             try:
-                ctx_data = json.loads(ctx)
-                if ctx_data.get("chore_id") == match["id"]:
-                    update_nudge_status(nudge["id"], "Dismissed")
+                ctx_data = orjson.loads(ctx)
+                if ctx_data.get("chore_id") == chore_id:
+                    update_nudge_status(nudge["id"], new_status)
                     break
-            except (json.JSONDecodeError, TypeError):
+            except (orjson.JSONDecodeError, TypeError):
                 pass
 
-    logger.info("Chore skipped: %s", match["name"])
-    return f"No problem — skipping '{match['name']}' for today."
-
 
-def _fuzzy_match_chore(name: str, chores: list[dict]) -> dict | None:
-    """Match a chore name against the chores list (case-insensitive, partial match)."""
+def _fuzzy_match_chore(name: str) -> dict | None:
+    """Match a chore name against the cached chores (case-insensitive, partial match)."""
+    _get_chores_cached()  # refreshes the lowercased name index when stale
     name_lower = name.lower().strip()
 
     # Exact match first
-    for chore in chores:
-        if chore["name"].lower() == name_lower:
-            return chore
+    match = _chores_by_lower_name.get(name_lower)
+    if match:
+        return match
 
     # Partial match
-    for chore in chores:
-        if name_lower in chore["name"].lower() or chore["name"].lower() in name_lower:
+    for lower_name, chore in _chores_lower_names:
+        if name_lower in lower_name or lower_name in name_lower:
             return chore
 
     return None
@@ -307,8 +342,8 @@ def set_chore_preference(
     frequency: str | None = None,
 ) -> str:
     """Update chore preferences (like/dislike, preferred days, frequency)."""
-    chores = query_all_chores()
-    match = _fuzzy_match_chore(chore_name, chores)
+    chores = _get_chores_cached()
+    match = _fuzzy_match_chore(chore_name)
     if not match:
         return (
             f"Couldn't find a chore matching '{chore_name}'. "
@@ -321,6 +356,7 @@ def set_chore_preference(
         preferred_days=preferred_days,
         frequency=frequency,
     )
+    _invalidate_chores_cache()
 
     parts = []
     if preference:
@@ -341,11 +377,12 @@ def set_chore_preference(
 
 def get_chore_history(days: int = 7) -> str:
     """Get a summary of completed chores over the past N days."""
-    chore_nudges = query_nudges_by_type("chore", statuses=["Done"])
-    chores = query_all_chores()
-    chore_map = {c["id"]: c for c in chores}
-
     cutoff = date.today() - timedelta(days=days)
+    chore_nudges = query_nudges_by_type("chore", statuses=["Done"], scheduled_on_or_after=cutoff.isoformat())
+    if not chore_nudges:
+        return f"No chores completed in the past {days} days."
+    chores = _get_chores_cached()
+    chore_map = {c["id"]: c for c in chores}
     history: dict[str, list[str]] = {}
 
     for nudge in chore_nudges:
@@ -353,7 +390,7 @@ def get_chore_history(days: int = 7) -> str:
         if not scheduled:
             continue
         try:
-            nudge_date = datetime.fromisoformat(scheduled).date()
+            nudge_date = date.fromisoformat(scheduled[:10])
         except (ValueError, TypeError):
             continue
 
@@ -365,12 +402,12 @@ def get_chore_history(days: int = 7) -> str:
         duration = ""
         if ctx:
             try:
-                ctx_data = json.loads(ctx)
+                ctx_data = orjson.loads(ctx)
                 chore_id = ctx_data.get("chore_id", "")
                 if chore_id in chore_map:
                     chore_name = chore_map[chore_id]["name"]
                     duration = f" ({chore_map[chore_id]['duration']} min)"
-            except (json.JSONDecodeError, TypeError):
+            except (orjson.JSONDecodeError, TypeError):
                 pass
 
         day_str = nudge_date.strftime("%A %b %d")
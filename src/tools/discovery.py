@@ -1,10 +1,15 @@
 """Feature discovery, help menu, contextual tips, and usage tracking."""
 
-import json
+import atexit
 import logging
+import os
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import orjson
+
 from src.family_config import load_family_config
 
 logger = logging.getLogger(__name__)
@@ -318,6 +323,19 @@ TIP_DEFINITIONS: list[dict] = [
     },
 ]
 
+
+# Tool name → positions of the tips it triggers, so matching only looks at the
+# tools actually used instead of scanning every tip.
+def _build_trigger_index() -> dict[str, list[int]]:
+    index: dict[str, list[int]] = {}
+    for i, tip in enumerate(TIP_DEFINITIONS):
+        for tool in tip["trigger_tools"]:
+            index.setdefault(tool, []).append(i)
+    return index
+
+
+_TRIGGER_INDEX = _build_trigger_index()
+
 # ---------------------------------------------------------------------------
 # Usage counter persistence
 # ---------------------------------------------------------------------------
@@ -325,8 +343,18 @@ TIP_DEFINITIONS: list[dict] = [
 _DATA_DIR = Path("/app/data") if Path("/app/data").exists() else Path("data")
 _COUNTERS_FILE = _DATA_DIR / "usage_counters.json"
 _usage_counters: dict[str, dict] = {}
+# Counters change on every tool call; write them at most every few seconds and
+# once more at exit instead of rewriting the file per call.
+COUNTER_FLUSH_INTERVAL = 5.0  # seconds
+_counters_dirty = False
+_counters_last_flush = 0.0
 
-_CATEGORY_KEYS = [cat["key"] for cat in HELP_CATEGORIES]
+_CATEGORY_KEYS = tuple(cat["key"] for cat in HELP_CATEGORIES)
+# phone → categories still at zero; only changes when a counter leaves zero
+_underused_cache: dict[str, tuple[str, ...]] = {}
+# phone → id of the last contextual tip shown. Memory only: forgetting it on a
+# restart just risks one repeated tip, and it changes on almost every turn.
+_last_tips: dict[str, str] = {}
 
 
 def _load_counters() -> None:
@@ -334,28 +362,66 @@ def _load_counters() -> None:
     global _usage_counters
     try:
         if _COUNTERS_FILE.exists():
-            _usage_counters = json.loads(_COUNTERS_FILE.read_text())
+            _usage_counters = orjson.loads(_COUNTERS_FILE.read_bytes())
     except Exception as e:
         logger.warning("Failed to load usage counters: %s", e)
         _usage_counters = {}
+    _underused_cache.clear()
+    # Older files persisted the last tip inside each entry; carry it over once
+    for phone, entry in _usage_counters.items():
+        last_tip = entry.pop("_last_tip", "")
+        if last_tip:
+            _last_tips[phone] = last_tip
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Replace path with data durably: write + fsync a temp file, rename, fsync the directory."""
+    tmp = path.with_suffix(".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+    dir_fd = os.open(path.parent, os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
 
 
 def _save_counters() -> None:
     """Save usage counters atomically."""
+    global _counters_dirty, _counters_last_flush
     try:
         _DATA_DIR.mkdir(parents=True, exist_ok=True)
-        tmp = _COUNTERS_FILE.with_suffix(".tmp")
-        tmp.write_text(json.dumps(_usage_counters, indent=2))
-        tmp.replace(_COUNTERS_FILE)
+        _atomic_write_bytes(_COUNTERS_FILE, orjson.dumps(_usage_counters))
+        _counters_dirty = False
+        _counters_last_flush = time.monotonic()
     except Exception as e:
         logger.warning("Failed to save usage counters: %s", e)
 
 
+def _mark_counters_dirty() -> None:
+    """Note a counter change; flush if the last write is older than COUNTER_FLUSH_INTERVAL."""
+    global _counters_dirty
+    _counters_dirty = True
+    if time.monotonic() - _counters_last_flush >= COUNTER_FLUSH_INTERVAL:
+        _save_counters()
+
+
+def _flush_counters_at_exit() -> None:
+    if _counters_dirty:
+        _save_counters()
+
+
 def _ensure_phone(phone: str) -> dict:
     """Ensure a phone entry exists in counters and return it."""
     if phone not in _usage_counters:
         _usage_counters[phone] = {k: 0 for k in _CATEGORY_KEYS}
-        _usage_counters[phone]["_last_tip"] = ""
     return _usage_counters[phone]
 
 
@@ -365,14 +431,21 @@ def record_usage(phone: str, tool_name: str) -> None:
     if not category:
         return
     entry = _ensure_phone(phone)
-    entry[category] = entry.get(category, 0) + 1
-    _save_counters()
+    previous = entry.get(category, 0)
+    entry[category] = previous + 1
+    if previous == 0:
+        _underused_cache.pop(phone, None)
+    _mark_counters_dirty()
 
 
-def get_underused_categories(phone: str) -> list[str]:
+def get_underused_categories(phone: str) -> tuple[str, ...]:
     """Return category keys with zero usage, in help menu order."""
-    entry = _ensure_phone(phone)
-    return [k for k in _CATEGORY_KEYS if entry.get(k, 0) == 0]
+    underused = _underused_cache.get(phone)
+    if underused is None:
+        entry = _ensure_phone(phone)
+        underused = tuple(k for k in _CATEGORY_KEYS if entry.get(k, 0) == 0)
+        _underused_cache[phone] = underused
+    return underused
 
 
 # ---------------------------------------------------------------------------
@@ -380,6 +453,25 @@ def get_underused_categories(phone: str) -> list[str]:
 # ---------------------------------------------------------------------------
 
 
+PERSONALIZE_TIMEOUT = 2.0  # seconds to wait per category before using static examples
+_PERSONALIZE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="help-personalize")
+
+
+def _render_help_section(cat: dict, examples: list[str]) -> list[str]:
+    lines = [f"{cat['icon']} *{cat['name']}*", cat["capabilities"]]
+    lines.extend(f'\u2022 "{ex or ""}"' for ex in examples[:2])
+    lines.append("")
+    return lines
+
+
+# Static parts of the help menu, rendered once; {partner1} is filled per call
+_STATIC_HELP_SECTIONS = {cat["key"]: _render_help_section(cat, cat["static_examples"]) for cat in HELP_CATEGORIES}
+_TRY_LINES = {
+    cat["key"]: f'{cat["icon"]} {cat["name"]} \u2014 try: "{(cat["static_examples"] or [""])[0]}"'
+    for cat in HELP_CATEGORIES
+}
+
+
 def get_help(phone: str = "") -> str:
     """Build the personalized help menu.
 
@@ -388,40 +480,38 @@ def get_help(phone: str = "") -> str:
     """
     lines = ["Here's everything I can help with! Try any of these:\n"]
 
+    # Live personalization lookups are independent network calls; run them together
+    pending = {
+        cat["key"]: _PERSONALIZE_POOL.submit(_personalize, cat["personalize_from"], cat["key"])
+        for cat in HELP_CATEGORIES
+        if cat["personalize_from"]
+    }
+
     for cat in HELP_CATEGORIES:
-        examples = cat["static_examples"]
+        live = None
 
         # Try live personalization
-        if cat["personalize_from"]:
+        if cat["key"] in pending:
             try:
-                live = _personalize(cat["personalize_from"], cat["key"])
-                if live:
-                    examples = live
+                live = pending[cat["key"]].result(timeout=PERSONALIZE_TIMEOUT)
             except Exception as e:
                 logger.debug("Personalization failed for %s: %s", cat["key"], e)
 
-        lines.append(f"{cat['icon']} *{cat['name']}*")
-        lines.append(cat["capabilities"])
-        for ex in examples[:2]:
-            ex = ex.replace("{partner1}", _partner1_name()) if ex else ""
-            lines.append(f'\u2022 "{ex}"')
-        lines.append("")
+        lines.extend(_render_help_section(cat, live) if live else _STATIC_HELP_SECTIONS[cat["key"]])
 
     # Usage-aware "haven't tried" section
     if phone:
         unused = get_underused_categories(phone)
         if unused:
-            unused_cats = [c for c in HELP_CATEGORIES if c["key"] in unused]
+            unused_keys = set(unused)
+            unused_cats = [c for c in HELP_CATEGORIES if c["key"] in unused_keys]
             if unused_cats:
                 lines.append("\u2728 *Haven't tried yet:*")
-                for cat in unused_cats:
-                    ex = cat["static_examples"][0] if cat["static_examples"] else ""
-                    ex = ex.replace("{partner1}", _partner1_name()) if ex else ""
-                    lines.append(f'{cat["icon"]} {cat["name"]} \u2014 try: "{ex}"')
+                lines.extend(_TRY_LINES[cat["key"]] for cat in unused_cats)
                 lines.append("")
 
     lines.append("Just type any of these or ask me in your own words!")
-    return "\n".join(lines)
+    return "\n".join(lines).replace("{partner1}", _partner1_name())
 
 
 def _personalize(tool_name: str, category_key: str) -> list[str] | None:
@@ -465,41 +555,34 @@ def get_contextual_tip(tools_used: list[str], phone: str = "") -> str | None:
     Prefers tips about underused categories when phone is provided.
     Avoids repeating the last tip shown to this user.
     """
-    # Find all matching tips
-    matching = []
-    for tip in TIP_DEFINITIONS:
-        if any(t in tools_used for t in tip["trigger_tools"]):
-            matching.append(tip)
-
-    if not matching:
+    positions = {i for tool in set(tools_used) for i in _TRIGGER_INDEX.get(tool, ())}
+    if not positions:
         return None
 
     last_tip = ""
-    underused = []
+    underused: tuple[str, ...] = ()
     if phone:
-        entry = _ensure_phone(phone)
-        last_tip = entry.get("_last_tip", "")
+        last_tip = _last_tips.get(phone, "")
         underused = get_underused_categories(phone)
 
-    # Filter out the last tip shown
-    if last_tip:
-        filtered = [t for t in matching if t["id"] != last_tip]
-        if filtered:
-            matching = filtered
-
-    # Prefer tips about underused categories
-    if underused:
-        underused_tips = [t for t in matching if t["related_category"] in underused]
-        if underused_tips:
-            matching = underused_tips
-
-    tip = random.choice(matching)
-
-    # Save last tip
+    # One pass over the matching tips: rank each (not the last tip shown counts
+    # most, then underused category) and pick uniformly among the top rank.
+    tip = None
+    best_rank = -1
+    ties = 0
+    for i in positions:
+        candidate = TIP_DEFINITIONS[i]
+        rank = 2 * (candidate["id"] != last_tip) + (candidate["related_category"] in underused)
+        if rank > best_rank:
+            tip, best_rank, ties = candidate, rank, 1
+        elif rank == best_rank:
+            ties += 1
+            if random.random() * ties < 1:
+                tip = candidate
+
+    # Remember last tip (in memory only)
     if phone:
-        entry = _ensure_phone(phone)
-        entry["_last_tip"] = tip["id"]
-        _save_counters()
+        _last_tips[phone] = tip["id"]
 
     text = tip["text"]
     if text:
@@ -509,3 +592,4 @@ def get_contextual_tip(tools_used: list[str], phone: str = "") -> str | None:
 
 # Load counters on module import
 _load_counters()
+atexit.register(_flush_counters_at_exit)
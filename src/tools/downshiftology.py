@@ -1,9 +1,14 @@
 """Downshiftology.com recipe search, details, and import via WordPress REST API."""
 
+import atexit
 import html
 import json
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 
 import httpx
 
@@ -17,14 +22,17 @@ logger = logging.getLogger(__name__)
 
 DOWNSHIFTOLOGY_API_BASE = "https://downshiftology.com/wp-json/wp/v2"
 
-# WordPress WPRM taxonomy IDs (stable — researched from live API)
+# Shared keep-alive client so consecutive API calls reuse the TLS connection
+_CLIENT = httpx.Client(base_url=DOWNSHIFTOLOGY_API_BASE, timeout=15.0)
+atexit.register(_CLIENT.close)
+
+# WordPress WPRM taxonomy IDs (stable — researched from live API).
+# Keys are canonical names as produced by _norm ("main-course" → "main course").
 COURSE_IDS: dict[str, int] = {
     "dinner": 22904,
-    "main-course": 2001,
     "main course": 2001,
     "breakfast": 1998,
     "appetizer": 1999,
-    "side-dish": 2002,
     "side dish": 2002,
     "salad": 2003,
     "soup": 2000,
@@ -44,7 +52,6 @@ CUISINE_IDS: dict[str, int] = {
     "asian": 13246,
     "indian": 2010,
     "greek": 14244,
-    "middle-eastern": 13921,
     "middle eastern": 13921,
     "japanese": 2012,
     "chinese": 2011,
@@ -67,15 +74,58 @@ _dietary_terms: set[str] = {
 # Module-level cache for follow-up commands ("save number 3", "tell me more about 2")
 _last_search_results: list[dict] = []
 
+# Recipe API responses, so re-searches and "tell me more" / import of the same
+# recipe don't go back to the network. Published recipes change rarely.
+RESPONSE_CACHE_TTL = 24 * 3600  # seconds
+_RESPONSE_CACHE_MAX = 128
+_response_cache: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+_response_cache_lock = threading.Lock()
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
 
 
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _norm(name: str) -> str:
+    """Canonical form of a course/cuisine name: case-folded, hyphens as spaces."""
+    return name.strip().casefold().replace("-", " ")
+
+
 def _strip_html(text: str) -> str:
     """Remove HTML tags and unescape entities."""
-    return re.sub(r"<[^>]+>", "", html.unescape(text)).strip()
+    if "&" in text:
+        text = html.unescape(text)
+    if "<" in text:
+        text = _TAG_RE.sub("", text)
+    return text.strip()
+
+
+def _cached_get(path: str, params: dict) -> object:
+    """GET a Downshiftology API path and return the decoded JSON, cached for RESPONSE_CACHE_TTL.
+
+    Only successful responses are cached; errors raise httpx.HTTPError as before.
+    """
+    key = (path, tuple(sorted(params.items())))
+    with _response_cache_lock:
+        hit = _response_cache.get(key)
+        if hit and time.monotonic() - hit[0] < RESPONSE_CACHE_TTL:
+            _response_cache.move_to_end(key)
+            return hit[1]
+
+    resp = _CLIENT.get(path, params=params)
+    resp.raise_for_status()
+    data = resp.json()
+
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic(), data)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > _RESPONSE_CACHE_MAX:
+            _response_cache.popitem(last=False)
+    return data
 
 
 def _fetch_recipes(params: dict) -> list[dict]:
@@ -83,7 +133,6 @@ def _fetch_recipes(params: dict) -> list[dict]:
 
     Filters out roundup posts (parent_post_id == "0" or empty).
     """
-    url = f"{DOWNSHIFTOLOGY_API_BASE}/wprm_recipe"
     default_params = {
         "_fields": "id,title,link,recipe",
         "per_page": 20,
@@ -91,9 +140,7 @@ def _fetch_recipes(params: dict) -> list[dict]:
     default_params.update(params)
 
     try:
-        resp = httpx.get(url, params=default_params, timeout=15.0)
-        resp.raise_for_status()
-        recipes = resp.json()
+        recipes = _cached_get("/wprm_recipe", default_params)
     except httpx.HTTPError as e:
         logger.error("Downshiftology API error: %s", e)
         return []
@@ -157,11 +204,11 @@ def search_downshiftology(
     if query:
         params["search"] = query
     if course:
-        course_id = COURSE_IDS.get(course.lower())
+        course_id = COURSE_IDS.get(_norm(course))
         if course_id:
             params["wprm_course"] = course_id
     if cuisine:
-        cuisine_id = CUISINE_IDS.get(cuisine.lower())
+        cuisine_id = CUISINE_IDS.get(_norm(cuisine))
         if cuisine_id:
             params["wprm_cuisine"] = cuisine_id
 
@@ -170,8 +217,9 @@ def search_downshiftology(
         _last_search_results = []
         return "No recipes found on Downshiftology. Try broadening your search (e.g., just 'chicken' or 'dinner')."
 
-    # Format summaries
-    summaries = [_format_recipe_summary(r) for r in recipes]
+    # Format summaries; keep the full recipe blob (the search already requested
+    # the same fields as a by-ID fetch) so details/import need no second request
+    summaries = [{**_format_recipe_summary(r), "_full": r} for r in recipes]
 
     # Client-side dietary filter
     if dietary:
@@ -230,15 +278,9 @@ def get_downshiftology_details(result_number: int) -> str:
     cached = _last_search_results[result_number - 1]
     wprm_id = cached["wprm_id"]
 
-    # Re-fetch full recipe data by ID
+    # Full recipe data from the search response, else fetch it by ID
     try:
-        resp = httpx.get(
-            f"{DOWNSHIFTOLOGY_API_BASE}/wprm_recipe/{wprm_id}",
-            params={"_fields": "id,title,link,recipe"},
-            timeout=15.0,
-        )
-        resp.raise_for_status()
-        recipe_data = resp.json()
+        recipe_data = cached.get("_full") or _cached_get(f"/wprm_recipe/{wprm_id}", {"_fields": "id,title,link,recipe"})
     except httpx.HTTPError as e:
         logger.error("Failed to fetch recipe %s: %s", wprm_id, e)
         return f"Couldn't fetch recipe details. Try the link directly: {cached['link']}"
@@ -326,14 +368,41 @@ def get_downshiftology_details(result_number: int) -> str:
 # ---------------------------------------------------------------------------
 
 
+# Downshiftology cuisine tag (normalized with _norm) → Notion Cuisine value
+_CUISINE_MAP = {
+    "american": "American",
+    "mexican": "Mexican",
+    "italian": "Italian",
+    "asian": "Asian",
+    "chinese": "Asian",
+    "japanese": "Asian",
+    "indonesian": "Asian",
+    "mediterranean": "Mediterranean",
+    "greek": "Mediterranean",
+    "middle eastern": "Mediterranean",
+}
+
+# Substrings of ingredient names that mark a main course as Seafood
+_SEAFOOD_WORDS = ("shrimp", "salmon", "fish", "tuna", "cod", "crab")
+
+
+@lru_cache(maxsize=4)
+def _get_cookbook_id(name: str, description: str) -> str:
+    """Get or create a cookbook by name; the ID is remembered for the process lifetime."""
+    cookbook = notion.get_cookbook_by_name(name)
+    if cookbook:
+        return cookbook["id"]
+    return notion.create_cookbook(name, description)
+
+
 def _map_tags(recipe_data: dict) -> tuple[list[str], str]:
     """Map Downshiftology course/cuisine tags to Notion Tags and Cuisine values.
 
     Returns (tags_list, cuisine_string).
     """
     tags = recipe_data.get("tags", {})
-    course_names = {t.get("name", "").lower() for t in tags.get("course", [])}
-    cuisine_names = {t.get("name", "").lower() for t in tags.get("cuisine", [])}
+    course_names = {_norm(t.get("name", "")) for t in tags.get("course", [])}
+    cuisine_names = {_norm(t.get("name", "")) for t in tags.get("cuisine", [])}
 
     # Map course → Notion Tags
     notion_tags: list[str] = []
@@ -344,7 +413,7 @@ def _map_tags(recipe_data: dict) -> tuple[list[str], str]:
     if "main course" in course_names or "dinner" in course_names:
         # Check ingredients for meat vs seafood
         ingredients_text = " ".join(ing.get("name", "").lower() for ing in recipe_data.get("ingredients_flat", []))
-        if any(w in ingredients_text for w in ("shrimp", "salmon", "fish", "tuna", "cod", "crab")):
+        if any(w in ingredients_text for w in _SEAFOOD_WORDS):
             notion_tags.append("Seafood")
         else:
             notion_tags.append("Meat")
@@ -352,22 +421,9 @@ def _map_tags(recipe_data: dict) -> tuple[list[str], str]:
         notion_tags.append("Comfort Food")
 
     # Map cuisine → Notion Cuisine
-    cuisine_map = {
-        "american": "American",
-        "mexican": "Mexican",
-        "italian": "Italian",
-        "asian": "Asian",
-        "chinese": "Asian",
-        "japanese": "Asian",
-        "indonesian": "Asian",
-        "mediterranean": "Mediterranean",
-        "greek": "Mediterranean",
-        "middle eastern": "Mediterranean",
-        "middle-eastern": "Mediterranean",
-    }
     notion_cuisine = "Other"
     for cn in cuisine_names:
-        mapped = cuisine_map.get(cn)
+        mapped = _CUISINE_MAP.get(cn)
         if mapped:
             notion_cuisine = mapped
             break
@@ -394,6 +450,7 @@ def import_downshiftology_recipe(
         cached = _last_search_results[result_number - 1]
         wprm_id = cached["wprm_id"]
         recipe_link = cached["link"]
+        recipe_data = cached.get("_full")
     elif recipe_name:
         # Search by name
         results = _fetch_recipes({"search": recipe_name, "per_page": 1})
@@ -402,6 +459,7 @@ def import_downshiftology_recipe(
         summary = _format_recipe_summary(results[0])
         wprm_id = summary["wprm_id"]
         recipe_link = summary["link"]
+        recipe_data = results[0]
     else:
         return "Please provide a result number or recipe name to import."
 
@@ -410,27 +468,18 @@ def import_downshiftology_recipe(
     if existing:
         return f"This recipe is already saved! '{existing[0]['name']}' is already in your catalogue."
 
-    # Fetch full recipe data
-    try:
-        resp = httpx.get(
-            f"{DOWNSHIFTOLOGY_API_BASE}/wprm_recipe/{wprm_id}",
-            params={"_fields": "id,title,link,recipe"},
-            timeout=15.0,
-        )
-        resp.raise_for_status()
-        recipe_data = resp.json()
-    except httpx.HTTPError as e:
-        logger.error("Failed to fetch recipe %s for import: %s", wprm_id, e)
-        return "Failed to fetch recipe from Downshiftology. Please try again."
+    # Fetch full recipe data unless the search response already carried it
+    if not recipe_data:
+        try:
+            recipe_data = _cached_get(f"/wprm_recipe/{wprm_id}", {"_fields": "id,title,link,recipe"})
+        except httpx.HTTPError as e:
+            logger.error("Failed to fetch recipe %s for import: %s", wprm_id, e)
+            return "Failed to fetch recipe from Downshiftology. Please try again."
 
     r = recipe_data.get("recipe", {})
 
     # Get or create "Downshiftology" cookbook
-    cookbook = notion.get_cookbook_by_name("Downshiftology")
-    if not cookbook:
-        cookbook_id = notion.create_cookbook("Downshiftology", "Healthy recipes from downshiftology.com")
-    else:
-        cookbook_id = cookbook["id"]
+    cookbook_id = _get_cookbook_id("Downshiftology", "Healthy recipes from downshiftology.com")
 
     # Map fields
     name = _strip_html(r.get("name", ""))
@@ -510,16 +559,46 @@ def import_downshiftology_recipe(
 # ---------------------------------------------------------------------------
 
 
+# Grocery history names only change when someone edits the Notion database, so
+# recipe browsing reuses one fetch for a few minutes.
+GROCERY_CACHE_TTL = 300  # seconds
+_grocery_cache: list[str] | None = None
+_grocery_cache_time: float = 0.0
+
+
+def _get_grocery_items_cached() -> list[str]:
+    """Return grocery history item names, re-querying Notion at most once per GROCERY_CACHE_TTL."""
+    global _grocery_cache, _grocery_cache_time
+    if _grocery_cache is not None and (time.monotonic() - _grocery_cache_time) < GROCERY_CACHE_TTL:
+        return _grocery_cache
+    _grocery_cache = notion.get_all_grocery_items()
+    _grocery_cache_time = time.monotonic()
+    return _grocery_cache
+
+
+@lru_cache(maxsize=4)
+def _grocery_matcher(grocery_items: frozenset[str]) -> tuple[re.Pattern, str]:
+    """Build matchers for a grocery vocabulary.
+
+    Returns (pattern, joined): pattern finds any grocery item inside an
+    ingredient name in one scan; joined (NUL-separated items) finds an
+    ingredient name inside any grocery item with a single substring test.
+    """
+    ordered = sorted(grocery_items)
+    pattern = re.compile("|".join(re.escape(item) for item in ordered))
+    return pattern, "\x00".join(ordered)
+
+
 def _cross_reference_grocery_history(ingredients_flat: list[dict]) -> str:
     """Cross-reference recipe ingredients against grocery purchase history.
 
     Returns a formatted section showing which ingredients the family buys.
     """
-    grocery_items = notion.get_all_grocery_items()
+    grocery_items = _get_grocery_items_cached()
     if not grocery_items:
         return ""
 
-    grocery_set = set(grocery_items)
+    pattern, joined = _grocery_matcher(frozenset(grocery_items))
     on_hand = []
     new_ingredients = []
 
@@ -529,8 +608,8 @@ def _cross_reference_grocery_history(ingredients_flat: list[dict]) -> str:
             continue
         ing_lower = ing_name.lower()
 
-        # Check if ingredient matches any grocery history item (substring match)
-        matched = any(ing_lower in item or item in ing_lower for item in grocery_set)
+        # Check if ingredient matches any grocery history item (substring either way)
+        matched = ing_lower in joined or pattern.search(ing_lower) is not None
         if matched:
             on_hand.append(ing_name)
         else:
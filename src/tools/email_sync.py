@@ -24,11 +24,10 @@ from src.tools.amazon_sync import (
     _save_json,
     _strip_html,
     classify_item,
-    is_transaction_processed,
     load_category_mappings,
     load_sync_config,
     load_sync_records,
-    save_category_mapping,
+    save_category_mappings,
     save_sync_config,
     save_sync_record,
 )
@@ -91,6 +90,7 @@ def find_provider_transactions(provider: str, days: int = 30) -> list[dict]:
     resp.raise_for_status()
     txns = resp.json()["data"]["transactions"]
 
+    processed = load_sync_records()
     results = []
     for t in txns:
         payee = (t.get("payee_name") or "").lower()
@@ -101,7 +101,7 @@ def find_provider_transactions(provider: str, days: int = 30) -> list[dict]:
         if any(excl in payee for excl in _EXCLUDED_PAYEE_KEYWORDS):
             continue
         # Skip already-processed
-        if is_transaction_processed(t["id"]):
+        if t["id"] in processed:
             continue
         results.append(
             {
@@ -1028,17 +1028,21 @@ def handle_email_sync_reply(message_text: str) -> str:
                 return f"Failed to apply category: {e}"
 
             # Save mapping as user-approved
-            for item in items:
-                mapping = CategoryMapping(
-                    item_title_normalized=item.title.lower().strip(),
-                    category_name=item.classified_category,
-                    category_id=item.classified_category_id,
-                    confidence=1.0,
-                    source="user_approved",
-                    times_used=1,
-                    last_used=datetime.now().isoformat(),
-                )
-                save_category_mapping(mapping)
+            now = datetime.now().isoformat()
+            save_category_mappings(
+                [
+                    CategoryMapping(
+                        item_title_normalized=item.title.lower().strip(),
+                        category_name=item.classified_category,
+                        category_id=item.classified_category_id,
+                        confidence=1.0,
+                        source="user_approved",
+                        times_used=1,
+                        last_used=now,
+                    )
+                    for item in items
+                ]
+            )
 
         # Update sync record
         record.status = "split_applied"
@@ -1094,17 +1098,21 @@ def handle_email_sync_reply(message_text: str) -> str:
             return f"Failed to apply corrected category: {e}"
 
         # Save corrected mapping
-        for item in items:
-            mapping = CategoryMapping(
-                item_title_normalized=item.title.lower().strip(),
-                category_name=resolved["name"],
-                category_id=resolved["id"],
-                confidence=1.0,
-                source="user_corrected",
-                times_used=1,
-                last_used=datetime.now().isoformat(),
-            )
-            save_category_mapping(mapping)
+        now = datetime.now().isoformat()
+        save_category_mappings(
+            [
+                CategoryMapping(
+                    item_title_normalized=item.title.lower().strip(),
+                    category_name=resolved["name"],
+                    category_id=resolved["id"],
+                    confidence=1.0,
+                    source="user_corrected",
+                    times_used=1,
+                    last_used=now,
+                )
+                for item in items
+            ]
+        )
 
         # Update sync record
         record.status = "split_applied"
@@ -1121,12 +1121,20 @@ def query_pending_nudges(due_before: str) -> list[dict]:
     return nudges
 
 
-def query_nudges_by_type(nudge_type: str, statuses: list[str] | None = None) -> list[dict]:
+def query_nudges_by_type(
+    nudge_type: str,
+    statuses: list[str] | None = None,
+    context_contains: str | None = None,
+    scheduled_on_or_after: str | None = None,
+) -> list[dict]:
     """Query nudges by type and optionally by statuses.
 
     Args:
         nudge_type: The nudge type to filter (e.g., "departure", "laundry_washer")
         statuses: List of status values to include (e.g., ["Pending", "Sent"])
+        context_contains: Only nudges whose Context text contains this string
+            (e.g., a chore page ID), filtered server-side.
+        scheduled_on_or_after: Only nudges scheduled on or after this ISO date.
 
     Returns list of nudge dicts.
     """
@@ -1140,6 +1148,10 @@ def query_nudges_by_type(nudge_type: str, statuses: list[str] | None = None) ->
             filters.append(status_filters[0])
         else:
             filters.append({"or": status_filters})
+    if context_contains:
+        filters.append({"property": "Context", "rich_text": {"contains": context_contains}})
+    if scheduled_on_or_after:
+        filters.append({"property": "Scheduled Time", "date": {"on_or_after": scheduled_on_or_after}})
 
     query_filter = {"and": filters} if len(filters) > 1 else filters[0]
     results = notion.databases.query(database_id=NOTION_NUDGE_QUEUE_DB, filter=query_filter)
@@ -185,11 +185,13 @@ def suggest_category(store_name: str, line_items: list[dict]) -> dict:
 
     Uses cached mappings first, falls back to Claude Haiku classification.
     """
-    from src.tools.amazon_sync import lookup_cached_category
+    from src.tools.amazon_sync import load_category_mappings, lookup_cached_category
     from src.tools.ynab import _get_categories
 
+    mappings = load_category_mappings()
+
     # 1. Check cached mappings for store name
-    cached = lookup_cached_category(store_name)
+    cached = lookup_cached_category(store_name, mappings)
     if cached:
         return {
             "category_name": cached["category_name"],
@@ -200,7 +202,7 @@ def suggest_category(store_name: str, line_items: list[dict]) -> dict:
 
     # 2. Check cached mappings for line items
     for item in line_items[:5]:  # Check first 5 items
-        cached = lookup_cached_category(item.get("name", ""))
+        cached = lookup_cached_category(item.get("name", ""), mappings)
         if cached:
             return {
                 "category_name": cached["category_name"],
@@ -738,6 +738,46 @@ def split_transaction(transaction_id: str, subtransactions: list[dict]) -> str:
         return f"Failed to split transaction: {e.response.status_code}"
 
 
+def split_transactions_bulk(splits: list[tuple[str, list[dict]]]) -> set[str]:
+    """Split several YNAB transactions with one PATCH /transactions request.
+
+    Uses a single request (and a single unit of the 200/hour rate limit) for
+    the whole batch instead of one PUT per transaction.
+
+    Args:
+        splits: (transaction_id, subtransactions) pairs; subtransactions use the
+            same keys as split_transaction().
+
+    Returns:
+        IDs of the transactions YNAB reports as updated (empty set on failure).
+    """
+    if not splits:
+        return set()
+
+    transactions = [
+        {
+            "id": txn_id,
+            "subtransactions": [
+                {"amount": sub["amount_milliunits"], "category_id": sub["category_id"], "memo": sub.get("memo", "")}
+                for sub in subs
+            ],
+        }
+        for txn_id, subs in splits
+    ]
+
+    url = f"{BASE_URL}/budgets/{YNAB_BUDGET_ID}/transactions"
+    try:
+        resp = _ynab_request("patch", url, json={"transactions": transactions})
+        resp.raise_for_status()
+        return set(resp.json()["data"].get("transaction_ids", []))
+    except httpx.HTTPStatusError as e:
+        logger.error("YNAB split_transactions_bulk failed: %s — %s", e.response.status_code, e.response.text)
+        return set()
+    except httpx.RequestError as e:
+        logger.error("YNAB split_transactions_bulk failed: %s", e)
+        return set()
+
+
 def update_transaction_memo(transaction_id: str, memo: str) -> str:
     """Update the memo field on an existing YNAB transaction.
 
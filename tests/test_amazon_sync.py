@@ -0,0 +1,246 @@
+"""Tests for the Amazon sync records log (src/tools/amazon_sync.py)."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import orjson
+import pytest
+
+from src.tools import amazon_sync, ynab
+
+
+@pytest.fixture
+def records_dir(tmp_path, monkeypatch):
+    """Point the sync data files at a temp dir with a cold cache."""
+    monkeypatch.setattr(amazon_sync, "_DATA_DIR", tmp_path)
+    monkeypatch.setattr(amazon_sync, "_SYNC_RECORDS_FILE", tmp_path / "amazon_sync_records.json")
+    monkeypatch.setattr(amazon_sync, "_SYNC_RECORDS_LOG", tmp_path / "amazon_sync_records.ndjson")
+    monkeypatch.setattr(amazon_sync, "_CATEGORY_MAPPINGS_FILE", tmp_path / "category_mappings.json")
+    monkeypatch.setattr(amazon_sync, "_SYNC_CONFIG_FILE", tmp_path / "amazon_sync_config.json")
+    monkeypatch.setattr(amazon_sync, "_PENDING_SUGGESTIONS_FILE", tmp_path / "amazon_pending_suggestions.json")
+    monkeypatch.setattr(amazon_sync, "_records_state", {})
+    return tmp_path
+
+
+def _write_log(path, *lines):
+    path.write_bytes(b"".join(lines))
+
+
+def _line(txn_id, status):
+    return orjson.dumps({"id": txn_id, "data": {"status": status}}) + b"\n"
+
+
+class TestSyncRecordsLog:
+    def test_replay_last_line_wins(self, records_dir):
+        _write_log(
+            amazon_sync._SYNC_RECORDS_LOG,
+            _line("t1", "pending"),
+            _line("t2", "pending"),
+            _line("t1", "split_applied"),
+        )
+        records = amazon_sync.load_sync_records()
+        assert records == {"t1": {"status": "split_applied"}, "t2": {"status": "pending"}}
+
+    def test_torn_line_skipped(self, records_dir):
+        _write_log(amazon_sync._SYNC_RECORDS_LOG, _line("t1", "pending"), b'{"id": "t2", "da')
+        assert amazon_sync.load_sync_records() == {"t1": {"status": "pending"}}
+
+    def test_append_after_torn_line_starts_new_line(self, records_dir):
+        _write_log(amazon_sync._SYNC_RECORDS_LOG, _line("t1", "pending"), b'{"id": "t2", "da')
+        amazon_sync._append_sync_records({"t3": {"status": "pending"}})
+        amazon_sync._records_state.clear()
+        assert amazon_sync.load_sync_records() == {"t1": {"status": "pending"}, "t3": {"status": "pending"}}
+
+    def test_append_updates_cache_and_log(self, records_dir):
+        _write_log(amazon_sync._SYNC_RECORDS_LOG, _line("t1", "pending"))
+        amazon_sync._append_sync_records({"t1": {"status": "skipped"}})
+        assert amazon_sync.load_sync_records() == {"t1": {"status": "skipped"}}
+        amazon_sync._records_state.clear()
+        assert amazon_sync.load_sync_records() == {"t1": {"status": "skipped"}}
+
+    def test_legacy_json_migrated_once(self, records_dir):
+        legacy = {"t1": {"status": "pending"}, "t2": {"status": "skipped"}}
+        amazon_sync._SYNC_RECORDS_FILE.write_text(json.dumps(legacy))
+        assert amazon_sync.load_sync_records() == legacy
+        assert amazon_sync._SYNC_RECORDS_LOG.exists()
+
+        # The log is authoritative from now on; later legacy edits are ignored
+        amazon_sync._SYNC_RECORDS_FILE.write_text(json.dumps({"t9": {"status": "pending"}}))
+        amazon_sync._records_state.clear()
+        assert amazon_sync.load_sync_records() == legacy
+
+    def test_compaction_keeps_one_line_per_record(self, records_dir, monkeypatch):
+        monkeypatch.setattr(amazon_sync, "_COMPACT_MIN_LINES", 4)
+        for status in ("a", "b", "c", "d", "e"):
+            amazon_sync._append_sync_records({"t1": {"status": status}})
+        assert amazon_sync._SYNC_RECORDS_LOG.read_bytes() == _line("t1", "e")
+        amazon_sync._records_state.clear()
+        assert amazon_sync.load_sync_records() == {"t1": {"status": "e"}}
+
+    def test_load_failure_appends_without_compacting(self, records_dir, monkeypatch):
+        monkeypatch.setattr(amazon_sync, "_COMPACT_MIN_LINES", 1)
+        _write_log(amazon_sync._SYNC_RECORDS_LOG, *(_line(f"t{i}", "pending") for i in range(5)))
+        amazon_sync.load_sync_records()
+        amazon_sync._records_state["lines"] = 100  # would trigger compaction if trusted
+
+        # A line without "id" makes the replay fail, so the log can't be read in full
+        with amazon_sync._SYNC_RECORDS_LOG.open("ab") as f:
+            f.write(b'{"data": {}}\n')
+        amazon_sync._append_sync_records({"t9": {"status": "pending"}})
+
+        assert amazon_sync._records_state == {}
+        log_ids = [orjson.loads(line).get("id") for line in amazon_sync._SYNC_RECORDS_LOG.read_bytes().splitlines()]
+        assert log_ids == ["t0", "t1", "t2", "t3", "t4", None, "t9"]
+
+
+ORDER_EMAIL_HTML = """
+<html><head><style>td { font-family: Arial; }</style><script>var x = 1;</script></head>
+<body>
+<div>Hello Erin,</div>
+<p>Thanks for your order. <b>Order #</b> <a href="#">113-4567890-1234567</a></p>
+<table>
+  <tr><td>Crayola Washable Markers, 10 Count</td><td>Qty: 2</td>
+      <td><span>$</span><span>12</span><span>.99</span></td></tr>
+  <tr><td>Burt&#36;s Bees Baby Wipes &amp; Wash</td><td>Qty: 1</td><td>$8.49</td></tr>
+</table>
+<p>Item Subtotal: $34.47<br>Shipping &amp; Handling: $0.00<br/>Order Total:&nbsp;<strong>$37.23</strong></p>
+<h2>Arriving Friday</h2>
+</body></html>
+"""
+
+
+class TestStripHtml:
+    @pytest.mark.skipif(amazon_sync.HTMLParser is None, reason="selectolax not installed")
+    def test_selectolax_matches_regex_fallback(self):
+        assert amazon_sync._strip_html(ORDER_EMAIL_HTML) == amazon_sync._strip_html_regex(ORDER_EMAIL_HTML)
+
+    def test_inline_price_spans_stay_on_one_line(self):
+        text = amazon_sync._strip_html(ORDER_EMAIL_HTML)
+        assert "$ 12 .99" in text
+        assert "Shipping & Handling: $0.00" in text.splitlines()
+        assert "style" not in text and "var x" not in text
+
+
+class TestParseOrderEmail:
+    def _response(self, stop_reason):
+        order = {"order_number": "113-4567890-1234567", "grand_total": 37.23, "items": []}
+        block = SimpleNamespace(type="tool_use", input={"orders": [order]})
+        return SimpleNamespace(stop_reason=stop_reason, content=[block])
+
+    def test_truncated_tool_call_is_skipped(self):
+        with patch("anthropic.Anthropic") as client_cls:
+            client_cls.return_value.messages.create.return_value = self._response("max_tokens")
+            assert amazon_sync._parse_order_email(ORDER_EMAIL_HTML, "2026-03-01") == []
+
+    def test_complete_tool_call_is_parsed(self):
+        with patch("anthropic.Anthropic") as client_cls:
+            client_cls.return_value.messages.create.return_value = self._response("tool_use")
+            orders = amazon_sync._parse_order_email(ORDER_EMAIL_HTML, "2026-03-01")
+        assert [o["order_number"] for o in orders] == ["113-4567890-1234567"]
+
+
+def _split_match(txn_id):
+    item = SimpleNamespace(
+        title="Crayola Markers",
+        classified_category="Kids",
+        classified_category_id="cat-kids",
+        allocated_amount=12990,
+        confidence=0.9,
+    )
+    return {
+        "ynab_transaction": {"id": txn_id, "amount": -12990},
+        "sync_record": amazon_sync.SyncRecord(ynab_transaction_id=txn_id, status="enriched"),
+        "classified_items": [item],
+    }
+
+
+def _ynab_response(status_code, body=None):
+    request = httpx.Request("PATCH", "https://api.ynab.com/v1/budgets/b/transactions")
+    return httpx.Response(status_code, json=body or {}, request=request)
+
+
+class TestRunAutoSplit:
+    def _run(self, bulk_result):
+        """Run _run_auto_split for t1..t3; return the IDs split one at a time."""
+        matches = [_split_match(f"t{i}") for i in (1, 2, 3)]
+        with (
+            patch.object(ynab, "_ynab_request", **bulk_result),
+            patch.object(ynab, "split_transaction") as split_one,
+            patch.object(amazon_sync, "save_sync_records") as save_records,
+            patch.object(amazon_sync, "save_sync_config"),
+        ):
+            amazon_sync._run_auto_split(matches, amazon_sync.SyncConfig(auto_split_enabled=True))
+        saved = save_records.call_args.args[0]
+        assert [r.ynab_transaction_id for r in saved] == ["t1", "t2", "t3"]
+        assert all(r.status == "auto_split" for r in saved)
+        return [c.args[0] for c in split_one.call_args_list]
+
+    def test_all_confirmed_by_bulk_request(self):
+        body = {"data": {"transaction_ids": ["t1", "t2", "t3"]}}
+        assert self._run({"return_value": _ynab_response(200, body)}) == []
+
+    def test_missing_ids_fall_back_to_single_splits(self):
+        body = {"data": {"transaction_ids": ["t2"]}}
+        assert self._run({"return_value": _ynab_response(200, body)}) == ["t1", "t3"]
+
+    def test_http_error_falls_back_for_all(self):
+        assert self._run({"return_value": _ynab_response(500)}) == ["t1", "t2", "t3"]
+
+    def test_transport_error_falls_back_for_all(self):
+        assert self._run({"side_effect": httpx.ConnectError("connection reset")}) == ["t1", "t2", "t3"]
+
+    def test_bulk_split_transport_error_returns_empty(self):
+        with patch.object(ynab, "_ynab_request", side_effect=httpx.ConnectError("connection reset")):
+            assert ynab.split_transactions_bulk([("t1", [])]) == set()
+
+
+class TestHandleSyncReply:
+    @pytest.fixture
+    def pending(self, records_dir):
+        """Two split_pending suggestions: t1 ($12.99) then t2 ($8.49)."""
+        matches = []
+        for txn_id, amount in (("t1", 12990), ("t2", 8490)):
+            item = amazon_sync.MatchedItem(
+                title=f"Item {txn_id}",
+                price=amount / 1000,
+                classified_category="Kids",
+                classified_category_id="cat-kids",
+                confidence=0.9,
+                allocated_amount=amount,
+            )
+            record = amazon_sync.SyncRecord(ynab_transaction_id=txn_id, status="split_pending")
+            matches.append(
+                {
+                    "ynab_transaction": {"id": txn_id, "amount": -amount},
+                    "sync_record": record,
+                    "classified_items": [item],
+                }
+            )
+        amazon_sync.save_sync_records([m["sync_record"] for m in matches])
+        amazon_sync.set_pending_suggestions(matches)
+        with patch.object(ynab, "split_transaction") as split_one:
+            yield split_one
+
+    def test_txn_id_reply(self, pending):
+        reply = amazon_sync.handle_sync_reply("t2 yes")
+        assert reply.startswith("✅ Split applied for $8.49")
+        pending.assert_called_once()
+        assert pending.call_args.args[0] == "t2"
+        assert amazon_sync.load_sync_record("t2").status == "split_applied"
+        assert amazon_sync.load_sync_record("t1").status == "split_pending"
+
+    def test_unknown_txn_id_reply(self, pending):
+        assert amazon_sync.handle_sync_reply("t9 yes") == ""
+        pending.assert_not_called()
+        assert len(amazon_sync._load_pending_suggestions().ordered) == 2
+
+    def test_index_reply_after_earlier_entry_settled(self, pending):
+        assert amazon_sync.handle_sync_reply("t1 skip").startswith("⏭️ Skipped")
+        assert amazon_sync.handle_sync_reply("2 yes") == "Transaction #2 not found. Valid range: 1-1."
+
+        # Indexes shift down once t1 is settled, so "1" now means t2
+        assert amazon_sync.handle_sync_reply("1 yes").startswith("✅ Split applied for $8.49")
+        assert pending.call_args.args[0] == "t2"
+        assert amazon_sync.load_sync_record("t1").status == "skipped"
@@ -0,0 +1,102 @@
+"""Tests for shared Google OAuth credentials (src/auth.py)."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src import auth
+
+
+@pytest.fixture
+def token_paths(tmp_path, monkeypatch):
+    """No env token; volume and local token paths in a temp dir (files not created)."""
+    volume = tmp_path / "volume" / "token.json"
+    volume.parent.mkdir()
+    local = tmp_path / "token.json"
+    monkeypatch.setattr(auth, "GOOGLE_TOKEN_JSON", "")
+    monkeypatch.setattr(auth, "_VOLUME_TOKEN_PATH", volume)
+    monkeypatch.setattr(auth, "TOKEN_PATH", str(local))
+    monkeypatch.setattr(auth, "_creds", None)
+    return volume, local
+
+
+@pytest.fixture
+def credentials():
+    with patch.object(auth, "Credentials") as creds_cls:
+        yield creds_cls
+
+
+def _creds(valid=True, expired=False, refresh_token="refresh"):
+    creds = MagicMock(valid=valid, expired=expired, refresh_token=refresh_token)
+
+    def refresh(_request):
+        creds.valid, creds.expired = True, False
+
+    creds.refresh.side_effect = refresh
+    return creds
+
+
+class TestLoadCredentials:
+    def test_env_var_wins(self, token_paths, credentials, monkeypatch):
+        volume, local = token_paths
+        volume.write_text("{}")
+        local.write_text("{}")
+        monkeypatch.setattr(auth, "GOOGLE_TOKEN_JSON", '{"token": "env"}')
+
+        assert auth._load_credentials() is credentials.from_authorized_user_info.return_value
+        credentials.from_authorized_user_info.assert_called_once_with({"token": "env"}, auth.SCOPES)
+        credentials.from_authorized_user_file.assert_not_called()
+
+    def test_bad_env_var_falls_back_to_volume(self, token_paths, credentials, monkeypatch):
+        volume, local = token_paths
+        volume.write_text("{}")
+        local.write_text("{}")
+        monkeypatch.setattr(auth, "GOOGLE_TOKEN_JSON", "not json")
+
+        auth._load_credentials()
+        credentials.from_authorized_user_file.assert_called_once_with(str(volume), auth.SCOPES)
+
+    def test_local_file_when_no_env_or_volume(self, token_paths, credentials):
+        _, local = token_paths
+        local.write_text("{}")
+
+        auth._load_credentials()
+        credentials.from_authorized_user_file.assert_called_once_with(str(local), auth.SCOPES)
+
+    def test_nothing_stored(self, token_paths, credentials):
+        assert auth._load_credentials() is None
+
+
+class TestGetGoogleCredentials:
+    def test_valid_token_is_loaded_once_and_not_refreshed(self, token_paths):
+        creds = _creds()
+        with (
+            patch.object(auth, "_load_credentials", return_value=creds) as load,
+            patch.object(auth, "_persist") as persist,
+        ):
+            assert auth.get_google_credentials() is creds
+            assert auth.get_google_credentials() is creds
+        load.assert_called_once()
+        creds.refresh.assert_not_called()
+        persist.assert_not_called()
+
+    def test_expired_token_refreshed_once(self, token_paths):
+        creds = _creds(valid=False, expired=True)
+        with (
+            patch.object(auth, "_load_credentials", return_value=creds),
+            patch.object(auth, "_persist") as persist,
+        ):
+            auth.get_google_credentials()
+            auth.get_google_credentials()
+        creds.refresh.assert_called_once()
+        persist.assert_called_once_with(creds)
+
+    def test_unrefreshable_token_non_interactive_raises(self, token_paths):
+        creds = _creds(valid=False, expired=True, refresh_token=None)
+        with (
+            patch.object(auth, "_load_credentials", return_value=creds),
+            patch.object(auth, "_run_interactive_flow") as flow,
+            pytest.raises(RuntimeError),
+        ):
+            auth.get_google_credentials(interactive=False)
+        flow.assert_not_called()
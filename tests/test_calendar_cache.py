@@ -0,0 +1,98 @@
+"""Tests for the calendar read cache (src/tools/calendar.py)."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.tools import calendar
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(calendar, "_read_cache", calendar.OrderedDict())
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    """Fake Calendar service returning one event per list request."""
+    monkeypatch.setitem(calendar.CALENDAR_IDS, "test", "test@group.calendar.google.com")
+    service = MagicMock()
+    service.events.return_value.list.return_value.execute.side_effect = lambda: {
+        "items": [{"id": "e1", "summary": "Swim lessons", "start": {"dateTime": "2026-03-15T14:00:00-07:00"}}]
+    }
+    monkeypatch.setattr(calendar, "_get_service", lambda: service)
+    return service
+
+
+def _list_requests(service) -> int:
+    return service.events.return_value.list.return_value.execute.call_count
+
+
+class TestReadCacheBounds:
+    def test_expired_entry_removed_on_get(self, monkeypatch):
+        calendar._read_cache_put(("k",), "v")
+        now = calendar.time.monotonic()
+        monkeypatch.setattr(calendar.time, "monotonic", lambda: now + calendar.READ_CACHE_TTL)
+        assert calendar._read_cache_get(("k",)) is None
+        assert ("k",) not in calendar._read_cache
+
+    def test_size_capped_least_recently_used_first(self, monkeypatch):
+        monkeypatch.setattr(calendar, "_READ_CACHE_MAX", 2)
+        calendar._read_cache_put(("a",), 1)
+        calendar._read_cache_put(("b",), 2)
+        calendar._read_cache_get(("a",))
+        calendar._read_cache_put(("c",), 3)
+        assert list(calendar._read_cache) == [("a",), ("c",)]
+
+    def test_upcoming_events_do_not_pin_raw_lists(self, fake_service):
+        calendar.get_calendar_events(days_ahead=7, calendar_names=["test"])
+        calendar.get_calendar_events(days_ahead=7, calendar_names=["test"])
+        assert _list_requests(fake_service) == 1
+        assert [key[0] for key in calendar._read_cache] == ["upcoming"]
+
+
+class TestDeleteCalendarEvent:
+    @pytest.mark.parametrize("cancel_mode", ["single", "all_following"])
+    def test_cache_cleared_after_delete(self, fake_service, cancel_mode):
+        events = fake_service.events.return_value
+        events.get.return_value.execute.return_value = {"id": "e1", "summary": "Swim lessons"}
+
+        def delete_after_read(**kwargs):
+            # A read racing the delete refills the cache with the doomed event
+            calendar._read_cache_put(("day",), ["e1"])
+            return MagicMock()
+
+        events.delete.side_effect = delete_after_read
+        calendar.delete_calendar_event("e1", "test", cancel_mode)
+        assert calendar._read_cache_get(("day",)) is None
+
+    def test_failed_delete_keeps_cache(self, fake_service):
+        events = fake_service.events.return_value
+        events.get.return_value.execute.return_value = {"id": "e1", "summary": "Swim lessons"}
+        events.delete.return_value.execute.side_effect = RuntimeError("backend error")
+        calendar._read_cache_put(("day",), ["e1"])
+
+        assert calendar.delete_calendar_event("e1", "test").startswith("Failed to cancel occurrence")
+        assert calendar._read_cache_get(("day",)) == ["e1"]
+
+
+class TestListCalendarsCopies:
+    def test_caller_changes_do_not_leak_into_cache(self, fake_service):
+        args = (["test"], "2026-03-15T00:00:00Z", "2026-03-16T00:00:00Z", calendar._FIELDS_DAY)
+        first = calendar._list_calendars(*args)
+        first[0]["summary"] = "Changed"
+        first[0]["_extra"] = True
+
+        second = calendar._list_calendars(*args)
+        second[0]["_calendar_source"] = "other"
+        third = calendar._list_calendars(*args)
+
+        assert _list_requests(fake_service) == 1
+        assert third == [
+            {
+                "id": "e1",
+                "summary": "Swim lessons",
+                "start": {"dateTime": "2026-03-15T14:00:00-07:00"},
+                "_calendar_source": "test",
+            }
+        ]
@@ -0,0 +1,79 @@
+"""Tests for bulk calendar deletes by event ID (delete_events_by_id)."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.tools import calendar
+
+
+def _service(batch_failures: set[str]):
+    """Fake Calendar service whose batch deletes fail for ``batch_failures``."""
+    service = MagicMock()
+    service.events.return_value.delete.side_effect = lambda calendarId, eventId: eventId
+
+    def new_batch(callback):
+        added = []
+        batch = MagicMock()
+        batch.add.side_effect = lambda request, request_id: added.append(request_id)
+
+        def execute():
+            for request_id in added:
+                callback(request_id, None, RuntimeError("backend error") if request_id in batch_failures else None)
+
+        batch.execute.side_effect = execute
+        return batch
+
+    service.new_batch_http_request.side_effect = new_batch
+    return service
+
+
+@pytest.fixture
+def fake_calendar(monkeypatch):
+    monkeypatch.setitem(calendar.CALENDAR_IDS, "test", "test@group.calendar.google.com")
+
+    def install(batch_failures=(), single_failures=()):
+        """Install the fake service; returns the list of IDs retried one at a time."""
+        service = _service(set(batch_failures))
+        retried = []
+
+        def delete_one(cal_id, event_id):
+            retried.append(event_id)
+            return event_id not in single_failures
+
+        monkeypatch.setattr(calendar, "_get_service", lambda: service)
+        monkeypatch.setattr(calendar, "_delete_one", delete_one)
+        return retried
+
+    return install
+
+
+class TestDeleteEventsById:
+    def test_over_cap_refused_before_any_request(self, fake_calendar):
+        retried = fake_calendar()
+        ids = [f"e{i}" for i in range(calendar.MAX_CALENDAR_DELETES + 1)]
+        with patch.object(calendar, "_execute_batch") as batch, pytest.raises(ValueError, match="Safety limit"):
+            calendar.delete_events_by_id(ids, "test")
+        batch.assert_not_called()
+        assert retried == []
+
+    def test_at_cap_allowed(self, fake_calendar):
+        fake_calendar()
+        ids = [f"e{i}" for i in range(calendar.MAX_CALENDAR_DELETES)]
+        assert calendar.delete_events_by_id(ids, "test") == calendar.MAX_CALENDAR_DELETES
+
+    def test_all_confirmed_by_batch(self, fake_calendar):
+        retried = fake_calendar()
+        assert calendar.delete_events_by_id(["e1", "e2", "e3"], "test") == 3
+        assert retried == []
+
+    def test_unconfirmed_deletes_retried_individually(self, fake_calendar):
+        retried = fake_calendar(batch_failures={"e2", "e3"}, single_failures={"e3"})
+        assert calendar.delete_events_by_id(["e1", "e2", "e3"], "test") == 2
+        assert sorted(retried) == ["e2", "e3"]
+
+    def test_read_cache_cleared(self, fake_calendar):
+        fake_calendar()
+        calendar._read_cache_put(("key",), "stale")
+        calendar.delete_events_by_id(["e1"], "test")
+        assert calendar._read_cache_get(("key",)) is None